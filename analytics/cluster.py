@@ -1,10 +1,27 @@
-import numpy as np, pandas as pd, re
-from typing import Tuple, Dict
+import numpy as np, pandas as pd, time
+from dataclasses import dataclass, field
+from typing import Tuple, Dict, List
 from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
 from sklearn.cluster import KMeans
-from sklearn.decomposition import TruncatedSVD, IncrementalPCA
+from sklearn.decomposition import TruncatedSVD
+from sklearn.random_projection import SparseRandomProjection
 from collections import Counter
 from sklearn.feature_extraction import text
+from sklearn.pipeline import make_pipeline
+from analytics.examples import representative_examples
+from analytics.perf import PeakRSS
+from analytics.textnorm import text_features, normalize_series, fingerprint
+
+HASH_CHUNK_ROWS = 20000    # texts per worker task in parallel hashing
+ASSIGN_BATCH = 10000   # rows per approximate_predict / predict call in sample-fit mode
+KMEANS_RADIUS_Q = 0.95     # saved KMeans models leave rows farther than this fit-time quantile unassigned
+REFIT_MAX_UNASSIGNED = 0.35
+REFIT_MAX_DRIFT = 0.10     # allowed rise of the unassigned fraction over the fit-time one
+ROUND_SHRINK = 0.6         # min_cluster_size multiplier per reduction round
+MIN_CLUSTER_FLOOR = 5
+MIN_ROUND_GAIN = 0.02      # stop once a round recovers less than this share of the remaining "Other" rows
+SWEEP_SCORE_SAMPLE = 3000  # clustered rows sampled for silhouette / DBCV in a sweep
+RECUT_PURITY = 0.8         # share of a re-cut cluster's named points that must agree before its name is extended
 
 CUSTOM_STOPWORDS = set(text.ENGLISH_STOP_WORDS) | {
     "please","issue","help","error","need","user","problem","thanks","thank",
@@ -13,13 +30,6 @@ CUSTOM_STOPWORDS = set(text.ENGLISH_STOP_WORDS) | {
     "x000d","http","https","attachment","attachments","screenshot","screenshots"
 }
 
-def _clean_text(s):
-    s = str(s).lower()
-    s = re.sub(r"_x\d{4}_", " ", s)   # remove excel artifacts like _x000D_
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
 def _build_vectorizer(use_hashing=False, max_features=30000):
     if use_hashing:
         vec = HashingVectorizer(
@@ -46,38 +56,290 @@ def _build_vectorizer(use_hashing=False, max_features=30000):
         )
         return vec, None
 
+def _row_chunks(n_rows: int, batch: int, min_size: int):
+    """Row slices of ~``batch`` rows; a short tail is merged so every chunk has ``min_size`` rows."""
+    starts = list(range(0, n_rows, batch))
+    if len(starts) > 1 and n_rows - starts[-1] < min_size:
+        starts.pop()
+    return [slice(s, starts[i+1] if i+1 < len(starts) else n_rows) for i, s in enumerate(starts)]
+
+def _svd_batch_rows(n_comp: int, svd_batch_size: int | None, svd_memory_mb: float | None) -> int:
+    """Rows per chunk: the requested batch size, capped so the per-chunk dense
+    products (rows × (components + oversamples), float64) stay under the ceiling."""
+    batch = svd_batch_size or None
+    if svd_memory_mb:
+        cap = int(svd_memory_mb * 2**20 / (8 * (n_comp + 10)))
+        batch = min(batch, cap) if batch else cap
+    return max(int(batch), n_comp)
+
+class StreamingSVD:
+    """Randomized truncated SVD that reads ``X`` only through row-chunked sparse products.
+
+    Range finding, power iterations, the projection and ``transform`` all work
+    on ``batch_rows`` rows at a time, so the sparse matrix is never densified;
+    the largest dense temporaries are ``n_rows × (k + oversamples)`` and
+    ``(k + oversamples) × n_features``.
+    """
+    def __init__(self, n_components: int, batch_rows: int, n_iter: int = 4,
+                 n_oversamples: int = 10, random_state: int = 42):
+        self.n_components = n_components
+        self.batch_rows = batch_rows
+        self.n_iter = n_iter
+        self.n_oversamples = n_oversamples
+        self.random_state = random_state
+
+    def _chunks(self, X):
+        return _row_chunks(X.shape[0], self.batch_rows, 1)
+
+    def _matmul(self, X, M):     # X @ M
+        return np.vstack([X[sl] @ M for sl in self._chunks(X)])
+
+    def _rmatmul(self, X, Y):    # X.T @ Y
+        out = np.zeros((X.shape[1], Y.shape[1]))
+        for sl in self._chunks(X):
+            out += X[sl].T @ Y[sl]
+        return out
+
+    def fit(self, X):
+        rng = np.random.RandomState(self.random_state)
+        size = min(self.n_components + self.n_oversamples, *X.shape)
+        Q = rng.normal(size=(X.shape[1], size))
+        for _ in range(self.n_iter):
+            Y, _ = np.linalg.qr(self._matmul(X, Q))
+            Q, _ = np.linalg.qr(self._rmatmul(X, Y))
+        Y, _ = np.linalg.qr(self._matmul(X, Q))
+        B = self._rmatmul(X, Y).T                      # size × n_features
+        _, S, Vt = np.linalg.svd(B, full_matrices=False)
+        self.components_ = Vt[:self.n_components]
+        self.singular_values_ = S[:self.n_components]
+        return self
+
+    def transform(self, X):
+        return self._matmul(X, self.components_.T)
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+def _hash_chunk(args):
+    """Worker: normalize and hash one chunk; returns the CSR block and its document frequencies."""
+    vec, texts = args
+    X = vec.transform(normalize_series(pd.Series(texts, dtype=object)).tolist())
+    return X, np.bincount(X.indices, minlength=X.shape[1])
+
+def _parallel_hashing(texts: pd.Series, vec, n_jobs: int):
+    """Hash ``texts`` chunk by chunk in a process pool (the vectorizer is stateless),
+    vstack the blocks and fit IDF as a reduce over the per-chunk document frequencies."""
+    from concurrent.futures import ProcessPoolExecutor
+    from scipy import sparse
+    vals = texts.to_numpy(dtype=object)
+    batch = max(1, min(HASH_CHUNK_ROWS, -(-len(vals) // n_jobs)))
+    tasks = [(vec, vals[sl]) for sl in _row_chunks(len(vals), batch, 1)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+        parts = list(ex.map(_hash_chunk, tasks))
+    X = sparse.vstack([p[0] for p in parts], format="csr")
+    df = np.sum([p[1] for p in parts], axis=0)
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = np.log((1 + X.shape[0]) / (1 + df)) + 1   # same smoothed IDF as TfidfTransformer.fit
+    return tfidf.transform(X), tfidf
+
+def _n_components(n_features: int) -> int:
+    return min(100, max(2, int(n_features*0.2)))
+
+def _project(texts: pd.Series, max_features: int, notes: Dict | None, t0: float):
+    vec, _ = _build_vectorizer(use_hashing=True, max_features=max_features)   # L2-normalized rows
+    X = vec.transform(text_features(texts).norm.tolist())
+    t_vec = time.perf_counter()
+    proj = SparseRandomProjection(n_components=_n_components(X.shape[1]), dense_output=True, random_state=42)
+    Xs = proj.fit_transform(X)   # "fit" only draws the random matrix from X's shape
+    if notes is not None:
+        notes["featurize"] = {
+            "rows": X.shape[0], "features": X.shape[1], "components": proj.n_components_,
+            "svd_mode": "projection", "svd_batch_rows": None, "n_jobs": 1,
+            "vectorize_seconds": round(t_vec - t0, 2),
+            "svd_seconds": round(time.perf_counter() - t_vec, 2),
+        }
+    return X, Xs, vec, proj
+
 def featurize(texts: pd.Series,
               use_hashing: bool = False,
               max_features: int = 30000,
-              svd_batch_size: int | None = None):
-    texts = texts.map(_clean_text)
+              svd_batch_size: int | None = None,
+              svd_memory_mb: float | None = None,
+              notes: Dict | None = None,
+              n_jobs: int = 1,
+              use_projection: bool = False,
+              cache_mb: float = 0):
+    """Vectorize and reduce ``texts``; returns ``(X, Xs, vec, svd)``.
+
+    ``cache_mb > 0`` keeps results in the on-disk feature cache (LRU, capped at
+    that size) keyed by the text fingerprint and the settings below, so reruns
+    that only change clustering parameters skip vectorization and SVD.
+
+    ``use_projection`` is the fit-free fast path: hashed, L2-normalized term
+    counts are mapped to ``Xs`` by a sparse random projection in a single pass
+    (no IDF, no SVD), trading some cluster quality for speed on exploratory runs.
+
+    With ``use_hashing`` and ``n_jobs > 1`` normalization and hashing run in a
+    process pool (see ``_parallel_hashing``); TF-IDF cannot be split that way
+    because its vocabulary is fitted on the whole corpus.
+
+    With ``svd_batch_size`` or ``svd_memory_mb`` set, the reduction runs out of
+    core: ``StreamingSVD`` is fitted and applied chunk by chunk and the sparse
+    matrix is never densified. Timing and the peak RSS of this call (see
+    ``analytics.perf.PeakRSS``; process-wide) go to ``notes["featurize"]`` when a dict is passed.
+    """
+    with PeakRSS() as mem:
+        out = _featurize(texts, use_hashing, max_features, svd_batch_size, svd_memory_mb, notes, n_jobs,
+                         use_projection, cache_mb)
+    if notes is not None:
+        notes["featurize"].update(peak_rss_mb=mem.peak_mb, rss_delta_mb=mem.delta_mb)
+    return out
+
+def _featurize(texts, use_hashing, max_features, svd_batch_size, svd_memory_mb, notes, n_jobs,
+               use_projection, cache_mb):
+    t0 = time.perf_counter()
+    key = None
+    if cache_mb:
+        from storage.db import feature_key, load_features
+        key = feature_key(fingerprint(texts), use_hashing=use_hashing, max_features=max_features,
+                          svd_batch_size=svd_batch_size, svd_memory_mb=svd_memory_mb,
+                          use_projection=use_projection)
+        hit = load_features(key)
+        if hit is not None:
+            X, Xs = hit[0], hit[1]
+            if notes is not None:
+                notes["featurize"] = {
+                    "rows": X.shape[0], "features": X.shape[1], "components": Xs.shape[1],
+                    "svd_mode": "cached", "svd_batch_rows": None, "n_jobs": 1,
+                    "vectorize_seconds": round(time.perf_counter() - t0, 2), "svd_seconds": 0.0,
+                }
+            return hit
+    if use_projection:
+        out = _project(texts, max_features, notes, t0)
+    else:
+        out = _vectorize_reduce(texts, use_hashing, max_features, svd_batch_size, svd_memory_mb, notes, n_jobs, t0)
+    if key is not None:
+        from storage.db import save_features
+        save_features(key, *out, max_mb=cache_mb)
+    return out
+
+def _vectorize_reduce(texts, use_hashing, max_features, svd_batch_size, svd_memory_mb, notes, n_jobs, t0):
     vec, tfidf = _build_vectorizer(use_hashing=use_hashing, max_features=max_features)
-    if use_hashing:
-        X = vec.transform(texts.tolist())
-        X = tfidf.fit_transform(X)
+    if use_hashing and n_jobs > 1 and len(texts) > HASH_CHUNK_ROWS:
+        X, tfidf = _parallel_hashing(texts, vec, n_jobs)
     else:
-        X = vec.fit_transform(texts.tolist())
-    n_comp = min(100, max(2, int(X.shape[1]*0.2)))
-    if svd_batch_size:
-        svd = IncrementalPCA(n_components=n_comp, batch_size=svd_batch_size)
-        for start in range(0, X.shape[0], svd_batch_size):
-            svd.partial_fit(X[start:start+svd_batch_size].toarray())
-        Xs = svd.transform(X.toarray())
+        texts = text_features(texts).norm   # shared normalization, cached per dataset
+        if use_hashing:
+            X = tfidf.fit_transform(vec.transform(texts.tolist()))
+        else:
+            X = vec.fit_transform(texts.tolist())
+    if use_hashing:
+        vec = make_pipeline(vec, tfidf)   # fitted, so vec.transform reproduces X for new texts
+    t_vec = time.perf_counter()
+    n_comp = _n_components(X.shape[1])
+    batch = None
+    if (svd_batch_size or svd_memory_mb) and X.shape[0] > n_comp:
+        batch = _svd_batch_rows(n_comp, svd_batch_size, svd_memory_mb)
+        svd = StreamingSVD(n_components=n_comp, batch_rows=batch)
+        Xs = svd.fit_transform(X)
     else:
         svd = TruncatedSVD(n_components=n_comp, random_state=42)
         Xs = svd.fit_transform(X)
+    if notes is not None:
+        notes["featurize"] = {
+            "rows": X.shape[0], "features": X.shape[1], "components": n_comp,
+            "svd_mode": "streaming" if batch else "truncated",
+            "svd_batch_rows": batch,
+            "n_jobs": n_jobs if use_hashing else 1,
+            "vectorize_seconds": round(t_vec - t0, 2),
+            "svd_seconds": round(time.perf_counter() - t_vec, 2),
+        }
     return X, Xs, vec, svd
 
-def try_hdbscan(Xs, min_cluster_size=25, min_samples=None):
+def try_hdbscan(Xs, min_cluster_size=25, min_samples=None, weights=None):
+    """HDBSCAN has no sample weights: with ``weights`` each row is replicated
+    ``min(weight, min_cluster_size)`` times, enough for a heavily repeated text
+    to form a cluster on its own, and the first replica's label is returned.
+    ``clusterer.fit_rows_`` maps every fitted point back to its row of ``Xs``."""
     try:
         import hdbscan
         clusterer = hdbscan.HDBSCAN(min_cluster_size=min_cluster_size,
                                     min_samples=min_samples, prediction_data=True)
-        labels = clusterer.fit_predict(Xs)
+        if weights is None:
+            labels = clusterer.fit_predict(Xs)
+            clusterer.fit_rows_ = np.arange(Xs.shape[0])
+        else:
+            rep = np.clip(np.asarray(weights, dtype=np.int64), 1, min_cluster_size)
+            clusterer.fit_rows_ = np.repeat(np.arange(len(rep)), rep)
+            labels = clusterer.fit_predict(Xs[clusterer.fit_rows_])
+            labels = labels[np.cumsum(rep) - rep]
         return labels, "hdbscan", clusterer
     except Exception:
         return None, "none", None
 
+def stratified_sample(strata: np.ndarray, size: int, weights=None, seed: int = 42) -> np.ndarray:
+    """Row indices of a ~``size`` sample with each stratum represented in proportion
+    to its (weighted) share, at least one row per stratum, topped up at random
+    when small strata can't fill their allocation."""
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(pd.Series(strata))
+    w = np.ones(len(codes)) if weights is None else np.asarray(weights, dtype=float)
+    share = np.bincount(codes, weights=w) / w.sum()
+    out = []
+    for k, frac in enumerate(share):
+        rows = np.flatnonzero(codes == k)
+        n = min(len(rows), max(1, int(round(frac * size))))
+        out.append(rng.choice(rows, n, replace=False))
+    idx = np.concatenate(out) if out else np.empty(0, np.int64)
+    if len(idx) < size:   # strata smaller than their allocation: top up from the rest
+        rest = np.setdiff1d(np.arange(len(codes)), idx)
+        idx = np.concatenate([idx, rng.choice(rest, min(len(rest), size - len(idx)), replace=False)])
+    return np.sort(idx)
+
+def assign_clusters(model, algo: str, Xs, batch: int = ASSIGN_BATCH) -> np.ndarray:
+    """Label rows against an already fitted model, ``batch`` rows at a time
+    (HDBSCAN via ``approximate_predict``, KMeans via nearest centroid)."""
+    if algo == "hdbscan":
+        import hdbscan
+        predict = lambda part: hdbscan.approximate_predict(model, part)[0]
+    else:
+        predict = model.predict
+    return np.concatenate([predict(Xs[sl]) for sl in _row_chunks(Xs.shape[0], batch, 1)])
+
+def _fit_on_sample(Xs, min_cluster_size, kmeans_k, weights, sample_size, strata, compare_full):
+    t0 = time.perf_counter()
+    idx = stratified_sample(strata if strata is not None else np.zeros(Xs.shape[0]), sample_size, weights)
+    w = None if weights is None else np.asarray(weights)[idx]
+    fit_labels, algo, model = _fit_clusterer(Xs[idx], min_cluster_size, kmeans_k, w)
+    if algo == "hdbscan": model.fit_rows_ = idx[model.fit_rows_]
+    t_fit = time.perf_counter()
+    labels = assign_clusters(model, algo, Xs)
+    labels[idx] = fit_labels
+    # drift: how often the assignment path disagrees with the fit on the sample itself,
+    # and whether the assigned rows end up as noise more often than the sample did
+    stats = {
+        "rows": int(Xs.shape[0]), "sample": int(len(idx)),
+        "fit_seconds": round(t_fit - t0, 2), "assign_seconds": round(time.perf_counter() - t_fit, 2),
+        "self_agreement": round(float((assign_clusters(model, algo, Xs[idx]) == fit_labels).mean()), 3),
+        "noise_sample": round(float((fit_labels < 0).mean()), 3),
+        "noise_assigned": round(float((np.delete(labels, idx) < 0).mean()), 3) if len(idx) < Xs.shape[0] else 0.0,
+    }
+    if compare_full:
+        from sklearn.metrics import adjusted_rand_score
+        full, _, _ = _fit_clusterer(Xs, min_cluster_size, kmeans_k, weights)
+        stats["ari_vs_full"] = round(float(adjusted_rand_score(full, labels)), 3)
+    return labels, algo, model, stats
+
+def _fit_clusterer(Xs, min_cluster_size, kmeans_k, weights, min_samples=None):
+    labels, algo, model = try_hdbscan(Xs, min_cluster_size=min_cluster_size,
+                                      min_samples=min_samples, weights=weights)
+    if labels is None or (labels.astype(int) < 0).all():
+        n = Xs.shape[0] if weights is None else int(np.sum(weights))
+        km = KMeans(n_clusters=min(kmeans_k, max(2, int(n/min_cluster_size)), Xs.shape[0]), random_state=42, n_init="auto")
+        labels = km.fit_predict(Xs, sample_weight=weights)
+        algo, model = "kmeans", km
+    return labels, algo, model
+
 def run_clustering(texts: pd.Series | None = None,
                    min_cluster_size=25,
                    kmeans_k=12,
@@ -87,7 +349,18 @@ def run_clustering(texts: pd.Series | None = None,
                    svd=None,
                    use_hashing: bool = False,
                    max_features: int = 30000,
-                   svd_batch_size: int | None = None) -> Tuple[np.ndarray,str,Dict]:
+                   svd_batch_size: int | None = None,
+                   weights=None,
+                   sample_size: int | None = None,
+                   strata=None,
+                   compare_full: bool = False) -> Tuple[np.ndarray,str,Dict]:
+    """Cluster rows of ``Xs``; ``weights`` (row multiplicities) are honoured by both algorithms.
+
+    With ``sample_size`` set and more rows than that, the clusterer is fitted on a
+    sample stratified by ``strata`` and the remaining rows are assigned to it in
+    batches; drift stats land in the returned ``ctx["sampling"]`` (``compare_full``
+    additionally runs the full fit and reports the adjusted Rand index against it).
+    """
     if X is None or Xs is None or vec is None or svd is None:
         if texts is None:
             raise ValueError("Either texts or precomputed features must be provided")
@@ -95,12 +368,80 @@ def run_clustering(texts: pd.Series | None = None,
                                     use_hashing=use_hashing,
                                     max_features=max_features,
                                     svd_batch_size=svd_batch_size)
-    labels, algo, model = try_hdbscan(Xs, min_cluster_size=min_cluster_size)
-    if labels is None or (labels.astype(int) < 0).all():
-        km = KMeans(n_clusters=min(kmeans_k, max(2, int(Xs.shape[0]/min_cluster_size))), random_state=42, n_init="auto")
-        labels = km.fit_predict(Xs)
-        algo, model = "kmeans", km
-    return labels, algo, {"vec":vec, "svd":svd, "model":model, "X":X, "Xs":Xs}
+    sampling = None
+    if sample_size and Xs.shape[0] > sample_size:
+        labels, algo, model, sampling = _fit_on_sample(Xs, min_cluster_size, kmeans_k, weights,
+                                                       sample_size, strata, compare_full)
+    else:
+        labels, algo, model = _fit_clusterer(Xs, min_cluster_size, kmeans_k, weights)
+    return labels, algo, {"vec":vec, "svd":svd, "model":model, "X":X, "Xs":Xs, "sampling":sampling}
+
+def _strata(df: pd.DataFrame, codes: np.ndarray, n_unique: int) -> np.ndarray:
+    """Opened month × assignment group of each unique text (taken from its first row)."""
+    key = pd.Series("", index=df.index)
+    if "opened_dt" in df.columns:
+        key = key + pd.to_datetime(df["opened_dt"], errors="coerce").dt.strftime("%Y-%m").fillna("")
+    if "assignment_group" in df.columns:
+        key = key + "|" + df["assignment_group"].astype(str)
+    out = np.empty(n_unique, dtype=object)
+    out[codes[::-1]] = key.to_numpy()[::-1]   # reversed so the first occurrence wins
+    return out
+
+def _join_distances(tree) -> np.ndarray:
+    """Distance at which each point of a single-linkage tree first merges."""
+    Z = tree.to_numpy()
+    n = len(Z) + 1
+    out = np.empty(n)
+    for col in (0, 1):
+        child = Z[:, col].astype(np.int64)
+        leaf = child < n
+        out[child[leaf]] = Z[leaf, 2]
+    return out
+
+class _Centroids:
+    """Nearest-centroid stand-in for clusters recovered by a re-cut (KMeans-like API)."""
+    def __init__(self, centers: np.ndarray):
+        self.cluster_centers_ = centers
+
+    def transform(self, X):
+        from sklearn.metrics import euclidean_distances
+        return euclidean_distances(X, self.cluster_centers_)
+
+    def predict(self, X):
+        return self.transform(X).argmin(axis=1)
+
+def _recut(clusterer, uid: np.ndarray, names: np.ndarray, weights: np.ndarray,
+           min_cluster_size: int, quantile: float, round_no: int):
+    """Recover "Other" points from an existing HDBSCAN fit by cutting its
+    single-linkage tree at a looser distance (no refit).
+
+    ``uid`` maps tree points to unique texts, ``names`` is the current name per
+    unique text (None = still Other). A re-cut cluster whose named points mostly
+    agree (``RECUT_PURITY``) extends that name to its Other points; one made of
+    Other points only becomes a new cluster when their weight reaches
+    ``min_cluster_size``. Mixed clusters are left alone.
+    Returns ``({unique id: name}, cut distance)``.
+    """
+    tree = clusterer.single_linkage_tree_
+    other = np.array([names[u] is None for u in uid])
+    if not other.any(): return {}, None
+    cut = float(np.quantile(_join_distances(tree)[other], quantile))
+    lab = tree.get_clusters(cut, min_cluster_size=min_cluster_size)
+    out = {}
+    for k in np.unique(lab[lab >= 0]):
+        members = lab == k
+        todo = np.unique(uid[members & other])
+        if not len(todo): continue
+        named = [names[u] for u in uid[members & ~other]]
+        if named:
+            name, n = Counter(named).most_common(1)[0]
+            if n < RECUT_PURITY * len(named): continue
+        elif weights[todo].sum() >= min_cluster_size:
+            name = cluster_name(round_no, k)
+        else:
+            continue
+        out.update({int(u): name for u in todo})
+    return out, cut
 
 def iterative_other_reduction(df: pd.DataFrame,
                               target_other_pct=0.12,
@@ -108,25 +449,333 @@ def iterative_other_reduction(df: pd.DataFrame,
                               min_cluster_size=25,
                               use_hashing: bool = False,
                               max_features: int = 30000,
-                              svd_batch_size: int | None = None) -> pd.DataFrame:
+                              svd_batch_size: int | None = None,
+                              svd_memory_mb: float | None = None,
+                              sample_size: int | None = None,
+                              compare_full: bool = False,
+                              n_jobs: int = 1,
+                              use_projection: bool = False,
+                              feature_cache_mb: float = 0,
+                              shrink: float = ROUND_SHRINK,
+                              min_round_gain: float = MIN_ROUND_GAIN,
+                              report: Dict | None = None) -> pd.DataFrame:
+    """Re-cluster the "Other" bucket until it drops to ``target_other_pct``.
+
+    Identical normalized texts are collapsed first: only the unique texts are
+    vectorized, reduced and clustered (their row counts act as weights) and the
+    labels are broadcast back to every row. Dedup stats go to ``report["dedup"]``.
+
+    Round 0 fits the clusterer; later rounds shrink ``min_cluster_size`` by
+    ``shrink`` and, when round 0 was HDBSCAN fitted on all texts, re-cut its
+    single-linkage tree at looser distances instead of refitting (other
+    algorithms and sampled fits are refitted on the leftovers, and so is any
+    round whose re-cut would recover less than ``min_round_gain``). Rounds stop
+    early once one recovers less than ``min_round_gain`` of the remaining Other
+    rows; per-round timing and gain go to ``report["rounds"]``.
+
+    ``sample_size`` switches large rounds to fit-on-sample / assign-the-rest,
+    stratified by opened month and assignment group; per-round drift stats go
+    to ``report["sampling"]`` (with ``compare_full`` each sampled round is also
+    fitted on all its texts and scored against that fit, ``ari_vs_full``). The fitted models are returned as a
+    ``ClusterModel`` in ``report["model"]`` so later exports can reuse them, and
+    a ``DriverHierarchy`` over the clusters in ``report["hierarchy"]`` and the
+    LLM prompt examples per cluster in ``report["examples"]``.
+    """
     df = df.copy()
-    X, Xs, vec, svd = featurize(df["text"],
+    n_other = int((df["driver"]=="Other").sum())
+    codes, uniq = pd.factorize(text_features(df["text"]).norm.to_numpy())
+    if report is not None:
+        report["dedup"] = {"rows": len(df), "unique": len(uniq),
+                           "ratio": round(len(df) / max(len(uniq), 1), 2)}
+    X, Xs, vec, svd = featurize(pd.Series(uniq, dtype=object),
                                 use_hashing=use_hashing,
                                 max_features=max_features,
-                                svd_batch_size=svd_batch_size)
-    for _ in range(max_rounds):
-        mask = df["driver"]=="Other"
+                                svd_batch_size=svd_batch_size,
+                                svd_memory_mb=svd_memory_mb,
+                                notes=report,
+                                n_jobs=n_jobs,
+                                use_projection=use_projection,
+                                cache_mb=feature_cache_mb)
+    strata = _strata(df, codes, len(uniq)) if sample_size else None
+    rounds, base, uid = [], None, None
+    names = np.full(len(uniq), None, dtype=object)   # cluster name per unique text
+    for r in range(max_rounds):
+        mask = (df["driver"]=="Other").to_numpy()
         if not mask.any(): break
         if mask.mean() <= target_other_pct: break
-        sub_X = X[mask.to_numpy()]
-        sub_Xs = Xs[mask.to_numpy()]
-        labels, algo, ctx = run_clustering(df.loc[mask,"text"],
-                                           min_cluster_size=min_cluster_size,
-                                           X=sub_X,
-                                           Xs=sub_Xs,
-                                           vec=vec,
-                                           svd=svd)
+        t0 = time.perf_counter()
+        mcs = max(MIN_CLUSTER_FLOOR, int(round(min_cluster_size * shrink**r)))
+        # unique texts still in Other, weighted by how many Other rows carry them
+        other_counts = np.bincount(codes[mask], minlength=len(uniq))
+        ids = np.flatnonzero(other_counts)
+        cut, found = None, None
+        if base is not None:
+            found, cut = _recut(base, uid, names, other_counts, mcs, 1 - 0.5**r, r)
+            if other_counts[np.fromiter(found, dtype=np.int64, count=len(found))].sum() < min_round_gain * mask.sum():
+                # the tree's reachability distances keep round 0's min_samples, so a looser cut can
+                # fold every leftover into one mixed cluster; refit the leftovers instead
+                found, cut, base = None, None, None
+        if found is not None:
+            mode = "recut"
+            got = np.array(sorted(found), dtype=np.int64)
+            for u, name in found.items():
+                names[u] = name
+            if len(got):
+                # persisted as nearest-centroid over the recovered texts, one centroid per name
+                labs = pd.Series(names[got])
+                centers = np.vstack([Xs[got[(labs == n).to_numpy()]].mean(axis=0) for n in labs.unique()])
+                rm = _round_model("centroid", _Centroids(centers), Xs[got])
+                rm["labels"] = list(labs.unique())
+                rounds.append(rm)
+        else:
+            mode = "fit" if r == 0 else "refit"
+            labels, algo, ctx = run_clustering(X=X[ids],
+                                               Xs=Xs[ids],
+                                               vec=vec,
+                                               svd=svd,
+                                               min_cluster_size=mcs,
+                                               weights=other_counts[ids],
+                                               sample_size=sample_size,
+                                               strata=None if strata is None else strata[ids],
+                                               compare_full=compare_full)
+            if ctx["sampling"] and report is not None:
+                report.setdefault("sampling", []).append(ctx["sampling"])
+            rounds.append(_round_model(algo, ctx["model"], Xs[ids]))
+            if algo == "hdbscan" and not ctx["sampling"]:
+                # a tree fitted on a sample holds only the sampled texts, so re-cutting it could
+                # never recover the rest; sampled rounds are refitted on the leftovers instead
+                base, uid = ctx["model"], ids[ctx["model"].fit_rows_]
+            hit = labels >= 0
+            names[ids[hit]] = [cluster_name(r, x) for x in labels[hit]]
         # label names → lightweight top-term strings (pre-LLM/Python labeling happens elsewhere)
-        sub = pd.Series(labels, index=df.index[mask])
-        df.loc[mask, "driver"] = sub.map(lambda x: f"cluster_{x}" if x != -1 else "Other")
+        sub = pd.Series(names[codes[mask]], index=df.index[mask])
+        df.loc[mask, "driver"] = sub.fillna("Other")
+        recovered = int(mask.sum() - (df["driver"]=="Other").sum())
+        gain = recovered / mask.sum()
+        if report is not None:
+            report.setdefault("rounds", []).append({
+                "round": r, "mode": mode, "min_cluster_size": mcs, "cut": cut,
+                "seconds": round(time.perf_counter() - t0, 2), "other_before": int(mask.sum()),
+                "recovered": recovered, "gain": round(gain, 4),
+                "other_pct": round(100.0 * (df["driver"]=="Other").mean(), 2)})
+        if gain < min_round_gain: break
+    if report is not None:
+        report["model"] = ClusterModel(
+            vec=vec, svd=svd, rounds=rounds,
+            stats={"rows": n_other, "unassigned_frac": round(float((df["driver"]=="Other").sum()) / max(n_other, 1), 4),
+                   "fitted_at": time.time(), "use_hashing": use_hashing, "use_projection": use_projection,
+                   "max_features": max_features})
+        report["hierarchy"] = build_driver_hierarchy(names, Xs, np.bincount(codes, minlength=len(uniq)))
+        report["examples"] = cluster_examples(names, Xs, codes, df["text"])
     return df
+
+def cluster_examples(names: np.ndarray, Xs, codes: np.ndarray, texts: pd.Series) -> Dict[str, List[str]]:
+    """Prompt examples per named cluster, picked on the reduced features ``Xs``.
+
+    ``names``/``Xs`` are per unique text; each unique text is shown as the first
+    row carrying it and weighted by its row count.
+    """
+    _, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    shown = texts.astype(str).to_numpy()[first]
+    named = pd.Series(names).dropna()
+    idx = named.index.to_numpy()
+    return {n: representative_examples(shown[idx[pos]], Xs[idx[pos]], counts[idx[pos]])
+            for n, pos in named.groupby(named).indices.items()}
+
+@dataclass
+class DriverHierarchy:
+    """Agglomerative merge tree over cluster centroids, fitted once.
+
+    ``cut(n)`` regroups the leaf drivers into ``n`` coarse drivers instantly;
+    each group is named after its largest member.
+    """
+    leaves: List[str]
+    sizes: np.ndarray
+    linkage: np.ndarray | None
+
+    def cut(self, n_groups: int) -> Dict[str, str]:
+        """Leaf driver name → coarse driver name at ``n_groups`` groups."""
+        if self.linkage is None or n_groups >= len(self.leaves):
+            return {l: l for l in self.leaves}
+        from scipy.cluster.hierarchy import fcluster
+        grp = fcluster(self.linkage, max(1, n_groups), criterion="maxclust")
+        head = {}
+        for g in np.unique(grp):
+            members = np.flatnonzero(grp == g)
+            head[g] = self.leaves[members[np.argmax(self.sizes[members])]]
+        return {l: head[g] for l, g in zip(self.leaves, grp)}
+
+    def rename(self, mapping: Dict[str, str]) -> "DriverHierarchy":
+        """Apply the labeling step's placeholder → title renames to the leaves."""
+        return DriverHierarchy([mapping.get(l, l) for l in self.leaves], self.sizes, self.linkage)
+
+def build_driver_hierarchy(names: np.ndarray, Xs, weights: np.ndarray) -> DriverHierarchy:
+    """Ward linkage over the (row-weighted, L2-normalized) centroid of each named cluster."""
+    named = np.flatnonzero(pd.notna(names))
+    leaves = list(pd.unique(names[named]))
+    if len(leaves) < 2:
+        return DriverHierarchy(leaves, np.ones(len(leaves)), None)
+    from scipy.cluster.hierarchy import linkage
+    codes = pd.Categorical(names[named], categories=leaves).codes
+    w = np.asarray(weights, dtype=float)[named]
+    sizes = np.bincount(codes, weights=w, minlength=len(leaves))
+    centers = np.zeros((len(leaves), Xs.shape[1]))
+    np.add.at(centers, codes, Xs[named] * w[:, None])
+    centers /= np.maximum(np.linalg.norm(centers, axis=1, keepdims=True), 1e-12)
+    return DriverHierarchy(leaves, sizes, linkage(centers, method="ward"))
+
+@dataclass
+class ClusterModel:
+    """Everything needed to assign new tickets without refitting.
+
+    ``rounds`` holds one fitted clusterer per reduction round (applied in order to
+    rows still unassigned; re-cut rounds are nearest-centroid models whose
+    ``labels`` name each centroid); ``names`` maps ``cluster_name(round, id)`` to the
+    driver label chosen for it, which keeps driver names stable across exports.
+    """
+    vec: object
+    svd: object
+    rounds: List[Dict]
+    names: Dict[str, str] = field(default_factory=dict)
+    stats: Dict = field(default_factory=dict)
+    hierarchy: "DriverHierarchy | None" = None   # with renamed leaves, for the Drill-down granularity
+
+def cluster_name(round_no: int, cluster_id: int) -> str:
+    """Placeholder driver name; the round keeps ids from different rounds apart."""
+    return f"cluster_{cluster_id}" if round_no == 0 else f"cluster_{round_no}_{cluster_id}"
+
+def _round_model(algo: str, model, Xs) -> Dict:
+    out = {"algo": algo, "model": model}
+    if algo in ("kmeans", "centroid") and len(Xs):
+        # centroid models assign everything; keep a radius so far-off new tickets stay "Other"
+        out["radius"] = float(np.quantile(model.transform(Xs).min(axis=1), KMEANS_RADIUS_Q))
+    return out
+
+def assign_new(texts: pd.Series, cm: ClusterModel, batch: int = ASSIGN_BATCH) -> Tuple[pd.Series, Dict]:
+    """Transform-only path: label ``texts`` (tickets the rules left as "Other")
+    with a saved ``ClusterModel``; returns ``(drivers, stats)``."""
+    t0 = time.perf_counter()
+    codes, uniq = pd.factorize(text_features(texts).norm.to_numpy())
+    lab = np.full(len(uniq), "Other", dtype=object)
+    if len(uniq):
+        Xs = cm.svd.transform(cm.vec.transform(list(uniq)))
+        todo = np.arange(len(uniq))
+        for r, rm in enumerate(cm.rounds):
+            if not len(todo): break
+            got = assign_clusters(rm["model"], rm["algo"], Xs[todo], batch)
+            if "radius" in rm:
+                dist = rm["model"].transform(Xs[todo]).min(axis=1)
+                got = np.where(dist <= rm["radius"], got, -1)
+            hit = got >= 0
+            names = [rm["labels"][x] if "labels" in rm else cluster_name(r, x) for x in got[hit]]
+            lab[todo[hit]] = [cm.names.get(n, n) for n in names]
+            todo = todo[~hit]
+    drivers = pd.Series(lab[codes], index=texts.index)
+    unassigned = float(drivers.eq("Other").mean()) if len(drivers) else 0.0
+    stats = {"rows": len(texts), "unique": len(uniq), "unassigned_frac": round(unassigned, 4),
+             "drift": round(unassigned - cm.stats.get("unassigned_frac", 0.0), 4),
+             "seconds": round(time.perf_counter() - t0, 2)}
+    return drivers, stats
+
+def needs_refit(stats: Dict, max_unassigned: float = REFIT_MAX_UNASSIGNED,
+                max_drift: float = REFIT_MAX_DRIFT) -> bool:
+    """Refit when too many new tickets fall outside the saved clusters, or
+    noticeably more than did when the model was fitted."""
+    return stats["unassigned_frac"] > max_unassigned or stats["drift"] > max_drift
+
+def model_key(use_hashing: bool, max_features: int, use_projection: bool = False) -> str:
+    """Saved cluster models are only reusable with the same vectorizer settings."""
+    mode = "projection" if use_projection else "hashing" if use_hashing else "tfidf"
+    return f"clusters-{mode}-{max_features}"
+
+# --- parameter sweep: one featurize, many fits in a process pool over shared-memory Xs ---
+_SWEEP = {}
+
+def _sweep_init(shm_name: str, shape, dtype: str, weights: np.ndarray):
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _SWEEP["shm"] = shm   # keep the mapping alive for the worker's lifetime
+    _SWEEP["Xs"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _SWEEP["weights"] = weights
+
+def _sweep_init_local(Xs, weights):
+    _SWEEP.pop("shm", None)
+    _SWEEP["Xs"], _SWEEP["weights"] = Xs, weights
+
+def _sweep_one(params: Dict) -> Dict:
+    Xs, w = _SWEEP["Xs"], _SWEEP["weights"]
+    t0 = time.perf_counter()
+    labels, algo, _ = _fit_clusterer(Xs, params["min_cluster_size"], params.get("kmeans_k", 12), w,
+                                     min_samples=params.get("min_samples"))
+    return {**params, **score_clustering(Xs, labels, w), "algo": algo,
+            "seconds": round(time.perf_counter() - t0, 2)}
+
+def score_clustering(Xs, labels: np.ndarray, weights=None, sample: int = SWEEP_SCORE_SAMPLE) -> Dict:
+    """Coverage (row-weighted share not in noise), cluster count, and silhouette /
+    DBCV on a sample of the clustered rows (NaN when there are fewer than 2 clusters)."""
+    w = np.ones(len(labels)) if weights is None else np.asarray(weights, dtype=float)
+    ok = labels >= 0
+    out = {"clusters": int(len(np.unique(labels[ok]))),
+           "coverage_pct": round(100.0 * w[ok].sum() / max(w.sum(), 1), 2),
+           "silhouette": float("nan"), "dbcv": float("nan")}
+    if out["clusters"] < 2: return out
+    idx = np.flatnonzero(ok)
+    if len(idx) > sample:
+        idx = np.sort(np.random.default_rng(0).choice(idx, sample, replace=False))
+    if len(np.unique(labels[idx])) < 2: return out
+    from sklearn.metrics import silhouette_score
+    out["silhouette"] = round(float(silhouette_score(Xs[idx], labels[idx])), 4)
+    try:
+        from hdbscan.validity import validity_index
+        with np.errstate(divide="ignore", invalid="ignore"):   # singleton clusters divide by zero
+            out["dbcv"] = round(float(validity_index(np.asarray(Xs[idx], dtype=np.float64), labels[idx])), 4)
+    except Exception:
+        pass
+    return out
+
+def sweep_params(Xs, grid: List[Dict], weights=None, n_jobs: int = 4) -> pd.DataFrame:
+    """Fit and score every parameter dict of ``grid`` on the same ``Xs``.
+
+    Workers attach to one shared-memory copy of ``Xs`` instead of each receiving
+    a pickled copy; ``n_jobs=1`` runs in-process.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    Xs = np.ascontiguousarray(Xs)
+    weights = None if weights is None else np.asarray(weights)
+    if n_jobs <= 1 or len(grid) <= 1:
+        _sweep_init_local(Xs, weights)
+        return pd.DataFrame([_sweep_one(p) for p in grid])
+    shm = shared_memory.SharedMemory(create=True, size=max(Xs.nbytes, 1))
+    try:
+        np.ndarray(Xs.shape, dtype=Xs.dtype, buffer=shm.buf)[:] = Xs
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(grid)), initializer=_sweep_init,
+                                 initargs=(shm.name, Xs.shape, Xs.dtype.str, weights)) as ex:
+            rows = list(ex.map(_sweep_one, grid))
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(rows)
+
+def sweep_clustering(texts: pd.Series,
+                     min_cluster_sizes=(10, 15, 25, 40, 60),
+                     min_samples=(None,),
+                     target_other_pct: float = 0.12,
+                     use_hashing: bool = False,
+                     max_features: int = 30000,
+                     n_jobs: int = 4,
+                     use_projection: bool = False,
+                     feature_cache_mb: float = 0) -> pd.DataFrame:
+    """Compare clustering settings on ``texts`` (typically the rules' "Other" rows)
+    with one deduplicated featurize; returns one row per setting, best first."""
+    codes, uniq = pd.factorize(text_features(texts).norm.to_numpy())
+    weights = np.bincount(codes, minlength=len(uniq))
+    _, Xs, _, _ = featurize(pd.Series(uniq, dtype=object), use_hashing=use_hashing, max_features=max_features,
+                            n_jobs=n_jobs, use_projection=use_projection, cache_mb=feature_cache_mb)
+    grid = [{"min_cluster_size": int(m), "min_samples": (None if s is None else int(s))}
+            for m in min_cluster_sizes for s in min_samples]
+    table = sweep_params(Xs, grid, weights=weights, n_jobs=n_jobs)
+    table["other_pct"] = (100.0 - table["coverage_pct"]).round(2)
+    table["meets_target"] = table["other_pct"] <= 100.0 * target_other_pct
+    return table.sort_values(["meets_target", "dbcv", "silhouette"], ascending=False, na_position="last",
+                             ignore_index=True)
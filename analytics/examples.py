@@ -0,0 +1,58 @@
+from typing import List, Sequence
+import numpy as np, pandas as pd
+from sklearn.preprocessing import normalize
+from analytics.textnorm import normalize_series
+
+# Representative examples for LLM prompts: the cluster medoid, then farthest-point
+# picks among the central members, deduplicated and trimmed to a token budget.
+EXAMPLES_K = 12
+EXAMPLE_CHARS = 280
+TOKEN_BUDGET = 600       # ~4 characters per token
+OUTLIER_Q = 0.25         # members least similar to the centroid are never picked
+NEAR_DUP = 0.9           # stop once every remaining member is this close to a picked one
+
+def _embed(texts: Sequence[str]):
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(n_features=2**18, ngram_range=(1, 2), alternate_sign=False).transform(texts)
+
+def _row(X, i: int) -> np.ndarray:
+    r = X[i]
+    return r.toarray().ravel() if hasattr(r, "toarray") else np.asarray(r).ravel()
+
+def representative_examples(texts: Sequence[str], X=None, weights=None, k: int = EXAMPLES_K,
+                            max_chars: int = EXAMPLE_CHARS, token_budget: int = TOKEN_BUDGET) -> List[str]:
+    """Pick up to ``k`` central yet diverse texts of one cluster.
+
+    ``X`` holds one embedding row per text (e.g. the cluster's rows of ``Xs``);
+    without it the texts are hashed. Texts with the same normalized form count
+    once. The first pick is the medoid (closest to the weighted centroid), each
+    further pick is the member farthest from everything picked so far, until
+    only near-duplicates are left or the token budget is spent.
+    """
+    raw = pd.Series(list(texts), dtype=object)
+    idx = np.flatnonzero((raw.notna() & raw.astype(str).str.strip().astype(bool)).to_numpy())
+    if not len(idx): return []
+    idx = idx[~normalize_series(raw.iloc[idx].astype(str)).duplicated().to_numpy()]
+    s = raw.iloc[idx].astype(str)
+    X = _embed(normalize_series(s).tolist()) if X is None else X[idx]
+    w = np.ones(len(idx)) if weights is None else np.asarray(weights, dtype=float)[idx]
+    X = normalize(X)
+    centroid = np.asarray(X.T @ w).ravel()
+    central = np.asarray(X @ centroid).ravel()
+    cand = np.flatnonzero(central >= np.quantile(central, OUTLIER_Q)) if len(s) > k else np.arange(len(s))
+    Xc = X[cand]
+    picked = [int(np.argmax(central[cand]))]
+    nearest = Xc @ _row(Xc, picked[0])      # max cosine to any picked example
+    nearest[picked[0]] = np.inf
+    while len(picked) < min(k, len(cand)):
+        i = int(np.argmin(nearest))
+        if nearest[i] >= NEAR_DUP: break
+        picked.append(i)
+        nearest = np.maximum(nearest, Xc @ _row(Xc, i))
+        nearest[i] = np.inf
+    out, budget = [], token_budget * 4
+    for i in picked:
+        t = s.iloc[cand[i]][:max_chars]
+        if out and len(t) > budget: break
+        out.append(t); budget -= len(t)
+    return out
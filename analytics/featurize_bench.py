@@ -0,0 +1,72 @@
+"""Benchmark the featurize engines: TF-IDF + SVD, hashing + SVD, and the fit-free projection.
+
+Reports vectorize / reduce time and peak RSS per engine, and how closely the
+clusters found on the projected features agree with the TF-IDF + SVD ones
+(adjusted Rand index and NMI on the same clusterer).
+
+    python -m analytics.featurize_bench --rows 50000
+    python -m analytics.featurize_bench --file storage/cache/norm-….parquet --column text
+"""
+import random, time
+from typing import Dict, List
+import pandas as pd
+from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+from analytics.cluster import featurize, run_clustering
+
+ENGINES = {
+    "tfidf+svd": {},
+    "hashing+svd": {"use_hashing": True},
+    "projection": {"use_projection": True},
+}
+
+def synthetic_texts(rows: int, seed: int = 0) -> pd.Series:
+    """Mock incidents with free-text noise, so clusters are not trivially separable."""
+    from connectors.mock_servicenow import make_incident
+    rnd = random.Random(seed)
+    filler = [f"tok{i}" for i in range(5000)]
+    out = []
+    for i in range(rows):
+        inc = make_incident(i)
+        out.append(f"{inc['short_description']} {inc['description']} " + " ".join(rnd.choices(filler, k=4)))
+    return pd.Series(out)
+
+def run(texts: pd.Series, max_features: int = 30000, min_cluster_size: int = 25) -> pd.DataFrame:
+    rows: List[Dict] = []
+    labels = {}
+    for name, kw in ENGINES.items():
+        notes = {}
+        t0 = time.perf_counter()
+        X, Xs, vec, svd = featurize(texts, max_features=max_features, notes=notes, **kw)
+        t_feat = time.perf_counter() - t0
+        lab, algo, _ = run_clustering(X=X, Xs=Xs, vec=vec, svd=svd, min_cluster_size=min_cluster_size)
+        labels[name] = lab
+        fz = notes["featurize"]
+        rows.append({"engine": name, "featurize_seconds": round(t_feat, 2),
+                     "vectorize_seconds": fz["vectorize_seconds"], "reduce_seconds": fz["svd_seconds"],
+                     "components": fz["components"], "peak_rss_mb": fz["peak_rss_mb"],
+                     "rss_delta_mb": fz["rss_delta_mb"],
+                     "algo": algo, "clusters": int(len(set(lab) - {-1})),
+                     "other_pct": round(100.0 * (lab < 0).mean(), 2)})
+    ref = labels["tfidf+svd"]
+    for r in rows:
+        r["ari_vs_tfidf_svd"] = round(adjusted_rand_score(ref, labels[r["engine"]]), 3)
+        r["nmi_vs_tfidf_svd"] = round(normalized_mutual_info_score(ref, labels[r["engine"]]), 3)
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Compare featurize engines on speed and cluster agreement")
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--file", help="CSV or Parquet file with a text column (overrides --rows)")
+    ap.add_argument("--column", default="text")
+    ap.add_argument("--max-features", type=int, default=30000)
+    ap.add_argument("--min-cluster-size", type=int, default=25)
+    a = ap.parse_args()
+
+    if a.file:
+        df = pd.read_parquet(a.file, columns=[a.column]) if a.file.endswith(".parquet") else pd.read_csv(a.file, usecols=[a.column])
+        texts = df[a.column].astype(str)
+    else:
+        texts = synthetic_texts(a.rows)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(run(texts, max_features=a.max_features, min_cluster_size=a.min_cluster_size).to_string(index=False))
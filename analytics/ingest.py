@@ -0,0 +1,105 @@
+import time
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+from openpyxl import load_workbook
+from analytics.mapping import propose_mapping
+from analytics.perf import PeakRSS
+
+CHUNK_ROWS = 50000
+CATEGORY_MAX_RATIO = 0.5   # object columns with fewer uniques than this share of rows become categoricals
+
+def _header(values) -> List[str]:
+    """Mirror pandas' header handling: blanks → 'Unnamed: i', duplicates → 'name.1'."""
+    out, seen = [], {}
+    for i, v in enumerate(values):
+        name = f"Unnamed: {i}" if v is None or str(v).strip() == "" else str(v).strip()
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        out.append(name)
+    return out
+
+def sheet_headers(wb) -> Dict[str, List[str]]:
+    """Read only the first row of every sheet of a read-only workbook."""
+    headers = {}
+    for ws in wb.worksheets:
+        first = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
+        headers[ws.title] = _header(first) if first else []
+    return headers
+
+def select_sheets(headers: Dict[str, List[str]]) -> List[str]:
+    """Sheets whose header maps to both short_description and description."""
+    used = []
+    for name, cols in headers.items():
+        m = propose_mapping(cols)
+        if m.get("short_description") and m.get("description"):
+            used.append(name)
+    return used
+
+def iter_sheet_chunks(ws, columns: List[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream data rows (below the header) in DataFrame chunks."""
+    buf = []
+    for row in ws.iter_rows(min_row=2, max_col=len(columns), values_only=True):
+        if all(v is None for v in row):
+            continue
+        buf.append(row)
+        if len(buf) >= chunk_rows:
+            yield pd.DataFrame.from_records(buf, columns=columns)
+            buf = []
+    if buf:
+        yield pd.DataFrame.from_records(buf, columns=columns)
+
+def compact_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numerics and turn low-cardinality object columns into categoricals."""
+    n = max(len(df), 1)
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_object_dtype(s):
+            if (pd.api.types.infer_dtype(s, skipna=True) == "string"
+                    and s.nunique(dropna=True) / n < CATEGORY_MAX_RATIO):
+                df[c] = s.astype("category")
+        elif pd.api.types.is_integer_dtype(s):
+            df[c] = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s):
+            df[c] = pd.to_numeric(s, downcast="float")
+    return df
+
+def read_workbook(f, chunk_rows: int = CHUNK_ROWS) -> Tuple[pd.DataFrame, List[str], List[Dict]]:
+    """Header-first, streaming Excel ingestion.
+
+    Only the header row of each sheet is read to decide which sheets carry
+    ticket text; the selected sheets are then streamed in ``chunk_rows`` chunks,
+    each compacted as it is read. Returns ``(raw, used_sheets, stats)`` where
+    ``stats`` holds rows, rows/sec and the (process-wide) peak RSS while reading each sheet.
+    """
+    wb = load_workbook(f, read_only=True, data_only=True)
+    try:
+        headers = sheet_headers(wb)
+        used = select_sheets(headers)
+        dfs, stats = [], []
+        for name in used:
+            with PeakRSS() as mem:
+                t0 = time.perf_counter()
+                chunks = [compact_columns(c) for c in iter_sheet_chunks(wb[name], headers[name], chunk_rows=chunk_rows)]
+                tmp = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=headers[name])
+                del chunks
+                tmp["source"] = name
+                # categories differing across chunks fall back to object on concat
+                dfs.append(compact_columns(tmp))
+                secs = time.perf_counter() - t0
+            stats.append({
+                "sheet": name,
+                "rows": len(tmp),
+                "seconds": round(secs, 2),
+                "rows_per_sec": round(len(tmp) / secs, 1) if secs > 0 else None,
+                "peak_rss_mb": mem.peak_mb,
+                "rss_delta_mb": mem.delta_mb,
+            })
+    finally:
+        wb.close()
+    raw = pd.concat(dfs, ignore_index=True, sort=False) if dfs else pd.DataFrame()
+    if len(dfs) > 1:
+        raw = compact_columns(raw)   # categories differing across sheets fall back to object on concat
+    return raw, used, stats
@@ -1,5 +1,6 @@
-import os, re, random, json
+import os, re, json
 from typing import List, Tuple
+from analytics.examples import representative_examples
 from openai import OpenAI
 import httpx
 
@@ -8,9 +9,7 @@ _http_client = httpx.Client(timeout=60.0)
 _client_singleton = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=_http_client)
 
 def _pick_examples(texts: List[str], k: int = 12) -> List[str]:
-    texts = [t for t in texts if isinstance(t, str) and t.strip()]
-    random.seed(42); random.shuffle(texts)
-    return [t[:280] for t in texts[:k]]
+    return representative_examples([t for t in texts if isinstance(t, str)], k=k)
 
 SYSTEM = (
     "You label IT support tickets into concise, executive-friendly 'call drivers'. "
@@ -1,51 +1,87 @@
-import os
-from typing import List, Tuple, Optional
-from analytics.py_label import python_label_for_cluster
+import asyncio, functools, hashlib, json, os, threading, time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Tuple, Optional
+import numpy as np
+from analytics.examples import representative_examples
+from analytics.py_label import distinctive_terms, python_label_clusters, python_label_for_cluster
+
+SYSTEM = ("You label IT support tickets into concise, executive-friendly 'call drivers'. "
+          "Return a short title (3-5 words, Title Case) and a one-line rationale.")
+
+def _prompt(examples: List[str]) -> str:
+    return "Examples (trimmed):\n---\n" + "\n---\n".join(examples) + "\n---\nReturn JSON: {\"title\":\"...\",\"rationale\":\"...\"}"
+
+def _parse(content: str) -> Optional[Tuple[str,str]]:
+    data = json.loads((content or "").strip())
+    title = data.get("title","").strip() or None
+    return (title, data.get("rationale","")) if title else None
+
+def _batch_prompt(batch: List[List[str]]) -> str:
+    body = "\n".join(f"### Cluster {i}\n---\n" + "\n---\n".join(ex) + "\n---" for i, ex in enumerate(batch, 1))
+    return ("Label each of the clusters below separately.\n" + body +
+            "\nReturn JSON: {\"labels\":[{\"id\":1,\"title\":\"...\",\"rationale\":\"...\"}, ...]} with one entry per cluster id.")
+
+def _parse_batch(content: str) -> Dict[int, Tuple[str,str]]:
+    """Cluster number (1-based, as in ``_batch_prompt``) → ``(title, rationale)``; bad entries are skipped."""
+    data = json.loads((content or "").strip())
+    out = {}
+    for item in (data.get("labels") or []) if isinstance(data, dict) else []:
+        try:
+            i, title = int(item.get("id")), str(item.get("title","")).strip()
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if title: out[i] = (title, str(item.get("rationale","")))
+    return out
+
+# Clients are pooled for the process lifetime: one per API key (and, for async
+# HTTP, per event loop — label_clusters always runs on the shared background loop).
+@functools.lru_cache(maxsize=4)
+def _gemini_client(key: str):
+    from google import genai
+    return genai.Client(api_key=key)
+
+@functools.lru_cache(maxsize=4)
+def _openai_client(key: str):
+    import openai, httpx
+    return openai.OpenAI(api_key=key, http_client=httpx.Client(timeout=60.0))
+
+@functools.lru_cache(maxsize=8)
+def _openai_async_client(loop, key: str, base_url: Optional[str], connections: int, timeout: float):
+    import openai, httpx
+    http = httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=connections,
+                                                                  max_keepalive_connections=connections))
+    return openai.AsyncOpenAI(api_key=key, base_url=base_url, http_client=http, max_retries=0)
+
+@functools.lru_cache(maxsize=1)
+def _background_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-labeling", daemon=True).start()
+    return loop
 
 # Gemini
 def _try_gemini(texts: List[str], model: str) -> Optional[Tuple[str,str]]:
     try:
-        from google import genai
         from google.genai import types
         key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         if not key: return None
-        client = genai.Client(api_key=key)
-        SYSTEM = ("You label IT support tickets into concise, executive-friendly 'call drivers'. "
-                  "Return a short title (3-5 words, Title Case) and a one-line rationale.")
-        prompt = "Examples (trimmed):\n---\n" + "\n---\n".join([t[:280] for t in texts[:12]]) + "\n---\nReturn JSON: {\"title\":\"...\",\"rationale\":\"...\"}"
-        resp = client.models.generate_content(
+        resp = _gemini_client(key).models.generate_content(
             model=model,
             contents=[{"role":"user","parts":[{"text": SYSTEM}]},
-                      {"role":"user","parts":[{"text": prompt}]}],
+                      {"role":"user","parts":[{"text": _prompt(representative_examples(texts))}]}],
             config=types.GenerateContentConfig(temperature=0.2, response_mime_type="application/json", max_output_tokens=256),
         )
-        import json, re
-        data = json.loads((resp.text or "").strip())
-        title = data.get("title","").strip() or None
-        rationale = data.get("rationale","")
-        if title: return (title, rationale)
+        return _parse(resp.text)
     except Exception:
         return None
-    return None
 
 # OpenAI (optional)
 def _try_openai(texts: List[str], model: str) -> Optional[Tuple[str,str]]:
     try:
-        import openai, httpx
         if not os.getenv("OPENAI_API_KEY"): return None
-        client = openai.OpenAI(http_client=httpx.Client(timeout=60.0))
-        SYSTEM = ("You label IT support tickets into concise, executive-friendly 'call drivers'. "
-                  "Return a short title (3-5 words, Title Case) and a one-line rationale.")
-        prompt = "Examples (trimmed):\n---\n" + "\n---\n".join([t[:280] for t in texts[:12]]) + "\n---\nReturn JSON: {\"title\":\"...\",\"rationale\":\"...\"}"
-        resp = client.chat.completions.create(model=model, temperature=0.2, messages=[{"role":"system","content":SYSTEM},{"role":"user","content":prompt}])
-        import json, re
-        data = json.loads(resp.choices[0].message.content.strip())
-        title = data.get("title","").strip() or None
-        rationale = data.get("rationale","")
-        if title: return (title, rationale)
+        resp = _openai_client(os.environ["OPENAI_API_KEY"]).chat.completions.create(model=model, temperature=0.2, messages=[{"role":"system","content":SYSTEM},{"role":"user","content":_prompt(representative_examples(texts))}])
+        return _parse(resp.choices[0].message.content)
     except Exception:
         return None
-    return None
 
 def best_label_for_cluster(texts: List[str], provider: str = "auto", gemini_model="gemini-2.5-flash", openai_model="gpt-4o-mini") -> Tuple[str,str,str]:
     """
@@ -60,3 +96,350 @@ def best_label_for_cluster(texts: List[str], provider: str = "auto", gemini_mode
     # fallback
     t, ra = python_label_for_cluster(texts)
     return (t, ra, "python")
+
+# --- batch labeling: all clusters concurrently, bounded and rate-limited ---
+# a provider completes (system, prompt, max_output_tokens) → raw JSON text
+Provider = Callable[[str, str, int], Awaitable[str]]
+
+@dataclass
+class LabelConfig:
+    provider: str = "auto"                 # auto, gemini, openai, off
+    gemini_model: str = "gemini-2.5-flash"
+    openai_model: str = "gpt-4o-mini"
+    openai_base_url: Optional[str] = None  # e.g. a local mock (analytics.mock_llm)
+    concurrency: int = 8                   # clusters labeled at once (and pooled connections)
+    rate_per_sec: float = 5.0              # provider requests per second (token bucket refill)
+    burst: int = 5                         # token bucket capacity
+    timeout: float = 30.0                  # per request; on expiry the next provider / Python label is used
+    batch_size: int = 1                    # clusters per request; >1 packs several into one JSON request
+    batch_tokens: int = 6000               # prompt budget of a batched request (stay well under the context window)
+    cache: bool = False                    # reuse stored labels of near-identical clusters (storage.db)
+    cache_threshold: float = 0.8           # min MinHash similarity to reuse a stored label
+    cache_ttl_days: float = 30.0
+    breaker_failures: int = 3              # consecutive failures that open a provider's circuit breaker
+    breaker_cooldown: float = 60.0         # seconds an open breaker skips the provider before one probe
+    hedge_factor: float = 2.0              # start a backup provider after this × the primary's EWMA latency (0 = off)
+    deadline: float = 120.0                # whole run; after it every unlabeled cluster gets its Python label
+
+SIG_PERM = 64         # MinHash slots per cluster signature
+SIG_TERMS = 20        # a cluster's signature covers its most distinctive words
+_MERSENNE = (1 << 31) - 1
+_SIG_A, _SIG_B = np.random.RandomState(7).randint(1, _MERSENNE, (2, SIG_PERM)).astype(np.uint64)
+
+def _minhash(terms: List[str]):
+    h = np.array([int.from_bytes(hashlib.blake2b(w.encode(), digest_size=8).digest(), "little") % _MERSENNE
+                  for w in terms or [""]], dtype=np.uint64)
+    return ((np.outer(_SIG_A, h) + _SIG_B[:, None]) % _MERSENNE).min(axis=1).astype(np.uint32)
+
+def cluster_signatures(clusters: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+    """MinHash (``SIG_PERM`` × uint32) per cluster over its top c-TF-IDF words.
+
+    Stopwords and the vocabulary every ticket shares ("please", "user", "unable")
+    are left out (see ``distinctive_terms``), so the signature says what the cluster
+    is about: a rerun on the same topic still matches while unrelated clusters
+    don't. Bigrams are left out too; which ones make the cut varies run to run.
+    """
+    return {k: _minhash([w for w in t if " " not in w]) for k, t in distinctive_terms(clusters, SIG_TERMS).items()}
+
+def cluster_signature(texts: List[str]):
+    return cluster_signatures({0: texts})[0]
+
+def _cache_model(cfg: "LabelConfig") -> Tuple[str, str]:
+    return cfg.provider, f"{cfg.gemini_model}|{cfg.openai_model}"
+
+class TokenBucket:
+    """Async token bucket: ``acquire`` waits until a request may be sent."""
+    def __init__(self, rate: float, capacity: int):
+        self.rate, self.capacity = rate, max(1, capacity)
+        self.tokens, self.last = float(self.capacity), time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ProviderHealth:
+    """Circuit breaker plus EWMA latency for one provider (touched only from the labeling loop).
+
+    After ``failures`` consecutive failed requests the breaker opens and the
+    provider is skipped for ``cooldown`` seconds; then a single probe request is
+    let through (half-open) and its outcome closes or re-opens the breaker.
+    """
+    ALPHA = 0.3
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures, self.cooldown = max(1, failures), cooldown
+        self.streak, self.opened_at, self.probing = 0, None, False
+        self.latency: Optional[float] = None    # EWMA of successful request seconds
+
+    @property
+    def open(self) -> bool:
+        return self.opened_at is not None
+
+    @property
+    def available(self) -> bool:
+        """Closed, or open but cooled down with no probe in flight."""
+        return self.opened_at is None or (not self.probing and time.monotonic() - self.opened_at >= self.cooldown)
+
+    def admit(self) -> bool:
+        """Whether a request may go out now (claims the probe slot when half-open)."""
+        if self.opened_at is None: return True
+        if not self.available: return False
+        self.probing = True
+        return True
+
+    def observe(self, seconds: float) -> None:
+        """Fold a latency sample into the EWMA (also used with a lower bound when a hedge loser is cancelled)."""
+        self.latency = seconds if self.latency is None else self.ALPHA * seconds + (1 - self.ALPHA) * self.latency
+
+    def record(self, ok: bool, seconds: float) -> None:
+        self.probing = False
+        if ok:
+            self.streak, self.opened_at = 0, None
+            self.observe(seconds)
+        else:
+            self.streak += 1
+            if self.streak >= self.failures:
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """An admitted request was cancelled (e.g. a lost hedge) without an outcome."""
+        self.probing = False
+
+# default providers' health outlives a run, so a bad key or an outage is skipped on the next rerun too
+_HEALTH: Dict[str, ProviderHealth] = {}
+
+def _health_key(source: str, cfg: LabelConfig) -> str:
+    key = (os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY") if source == "gemini" else os.getenv("OPENAI_API_KEY")) or ""
+    model = cfg.gemini_model if source == "gemini" else f"{cfg.openai_model}@{cfg.openai_base_url}"
+    return f"{source}|{model}|{hashlib.blake2b(key.encode(), digest_size=6).hexdigest()}"
+
+def _gemini_provider(cfg: LabelConfig) -> Optional[Provider]:
+    key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not key: return None
+    try:
+        from google.genai import types
+        client = _gemini_client(key)
+    except Exception:
+        return None
+    async def complete(system, prompt, max_tokens):
+        resp = await client.aio.models.generate_content(
+            model=cfg.gemini_model,
+            contents=[{"role":"user","parts":[{"text": system}]},
+                      {"role":"user","parts":[{"text": prompt}]}],
+            config=types.GenerateContentConfig(temperature=0.2, response_mime_type="application/json", max_output_tokens=max_tokens),
+        )
+        return resp.text
+    return complete
+
+def _openai_provider(cfg: LabelConfig) -> Optional[Provider]:
+    key = os.getenv("OPENAI_API_KEY")
+    if not key: return None
+    try:
+        client = _openai_async_client(asyncio.get_running_loop(), key, cfg.openai_base_url,
+                                      max(1, cfg.concurrency), cfg.timeout)
+    except Exception:
+        return None
+    async def complete(system, prompt, max_tokens):
+        resp = await client.chat.completions.create(model=cfg.openai_model, temperature=0.2, max_tokens=max_tokens,
+                                                    messages=[{"role":"system","content":system},{"role":"user","content":prompt}])
+        return resp.choices[0].message.content
+    return complete
+
+def _pack(keys: List[str], examples: Dict[str, List[str]], size: int, tokens: int) -> List[List[str]]:
+    """Greedy batches of at most ``size`` clusters and ~``tokens`` prompt tokens (4 chars per token)."""
+    out, cur, used = [], [], 0
+    for k in keys:
+        need = 20 + sum(len(t) + 5 for t in examples[k]) // 4
+        if cur and (len(cur) >= size or used + need > tokens):
+            out.append(cur); cur, used = [], 0
+        cur.append(k); used += need
+    return out + ([cur] if cur else [])
+
+async def alabel_clusters(clusters: Dict[str, List[str]], cfg: Optional[LabelConfig] = None,
+                          providers: Optional[List[Tuple[str, Provider]]] = None,
+                          report: Optional[Dict] = None,
+                          examples: Optional[Dict[str, List[str]]] = None) -> Dict[str, Tuple[str,str,str]]:
+    """Label every cluster concurrently; returns ``{key: (title, rationale, source)}``.
+
+    At most ``cfg.concurrency`` requests are in flight and they are paced by a
+    token bucket. With ``cfg.batch_size > 1`` several clusters share one JSON
+    request (packed to ``cfg.batch_tokens``) and are matched back by cluster
+    number; clusters missing from a reply go to the next provider. Each request
+    gets ``cfg.timeout`` seconds; clusters no provider labeled are named
+    together by ``python_label_clusters``. ``providers`` (``[(source, async
+    fn(system, prompt, max_tokens) -> str)]``) replaces the Gemini/OpenAI
+    defaults, e.g. for tests against a mock. Prompts carry ``examples[key]``
+    (e.g. ``iterative_other_reduction``'s ``report["examples"]``) or else
+    ``representative_examples`` of the cluster texts. With ``cfg.cache``
+    clusters whose signature matches a stored one are not sent at all.
+    """
+    cfg = cfg or LabelConfig()
+    sem = asyncio.Semaphore(max(1, cfg.concurrency))
+    bucket = TokenBucket(cfg.rate_per_sec, cfg.burst)
+    counts = {"timeouts": 0, "errors": 0, "requests": 0, "hedged": 0}
+    t0 = time.perf_counter()
+    end = time.monotonic() + (cfg.deadline or float("inf"))
+    health = {}
+    if providers is None:
+        providers = []
+        if cfg.provider in ("auto","gemini"):
+            p = _gemini_provider(cfg)
+            if p: providers.append(("gemini", p))
+        if cfg.provider in ("auto","openai"):
+            p = _openai_provider(cfg)
+            if p: providers.append(("openai", p))
+        for source, _ in providers:
+            health[source] = _HEALTH.setdefault(_health_key(source, cfg),
+                                                ProviderHealth(cfg.breaker_failures, cfg.breaker_cooldown))
+    for source, _ in providers:
+        health.setdefault(source, ProviderHealth(cfg.breaker_failures, cfg.breaker_cooldown))
+    errors_by_source = {source: 0 for source, _ in providers}
+
+    def route(skip):
+        """Available providers not tried yet, fastest EWMA latency first (unmeasured ones first, in order)."""
+        ok = [(s, c) for s, c in providers if s not in skip and health[s].available]
+        return sorted(ok, key=lambda p: health[p[0]].latency or 0.0)
+
+    async def request(source, complete, batch, ex):
+        h = health[source]
+        if end - time.monotonic() <= 0:
+            return {}   # run deadline reached: no new requests
+        probe = h.open
+        if not h.admit():
+            return {}   # the breaker opened while this request waited its turn
+        t = None
+        try:
+            await asyncio.wait_for(bucket.acquire(), end - time.monotonic())
+            left = end - time.monotonic()
+            if left <= 0:
+                if probe: h.release()
+                return {}
+            timeout = min(cfg.timeout, left)
+            counts["requests"] += 1
+            t = time.perf_counter()
+            if len(batch) == 1:
+                r = _parse(await asyncio.wait_for(complete(SYSTEM, _prompt(ex[batch[0]]), 256), timeout))
+                res = {batch[0]: r} if r else {}
+            else:
+                got = _parse_batch(await asyncio.wait_for(
+                    complete(SYSTEM, _batch_prompt([ex[k] for k in batch]), 64 + 64 * len(batch)), timeout))
+                res = {batch[i - 1]: r for i, r in got.items() if 1 <= i <= len(batch)}
+        except asyncio.CancelledError:
+            # a lost hedge: its elapsed time is a lower bound on this provider's latency
+            if t is not None: h.observe(time.perf_counter() - t)
+            if probe: h.release()
+            raise
+        except asyncio.TimeoutError:
+            if t is None or timeout < cfg.timeout:
+                # cut short by the run deadline, not the provider: no health verdict
+                if t is not None: counts["timeouts"] += 1
+                if probe: h.release()
+                return {}
+            counts["timeouts"] += 1; errors_by_source[source] += 1; res = {}
+        except Exception:
+            counts["errors"] += 1; errors_by_source[source] += 1; res = {}
+        h.record(bool(res), time.perf_counter() - t)
+        return res
+
+    async def backup_request(source, complete, batch, ex):
+        try:
+            return await request(source, complete, batch, ex)
+        finally:
+            sem.release()
+
+    async def hedged(order, batch, ex):
+        """Ask ``order[0]``; if it is slower than ``hedge_factor`` × its usual latency, race ``order[1]``.
+
+        The backup needs a free ``sem`` slot of its own (the caller already holds
+        one), so hedging never pushes past ``cfg.concurrency`` requests in flight.
+        """
+        (source, complete), backup = order[0], (order[1] if len(order) > 1 else None)
+        tasks = {asyncio.create_task(request(source, complete, batch, ex)): source}
+        tried = [source]
+        if backup and cfg.hedge_factor > 0:
+            lat = health[source].latency
+            delay = cfg.hedge_factor * lat if lat else cfg.timeout / 2
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and time.monotonic() < end and not sem.locked():
+                await sem.acquire()   # a free slot is taken without waiting
+                counts["hedged"] += 1
+                tasks[asyncio.create_task(backup_request(backup[0], backup[1], batch, ex))] = backup[0]
+                tried.append(backup[0])
+        res, winner = {}, None
+        pending = set(tasks)
+        while pending and not res:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result() and not res:
+                    res, winner = task.result(), tasks[task]
+        for task in pending: task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return res, winner, tried
+
+    async def run(batch, ex):
+        async with sem:
+            out, tried = {}, set()
+            while time.monotonic() < end:
+                left = [k for k in batch if k not in out]
+                order = route(tried)
+                if not left or not order: break
+                res, winner, used = await hedged(order, left, ex)
+                tried.update(used)
+                out.update({k: (t, ra, winner) for k, (t, ra) in res.items()})
+        return out
+
+    cached, sigs = {}, {}
+    if cfg.cache:
+        from storage.db import get_cached_labels
+        sigs = await asyncio.to_thread(cluster_signatures, clusters)
+        hits = get_cached_labels(list(sigs.values()), *_cache_model(cfg), cfg.cache_threshold, cfg.cache_ttl_days)
+        cached = {k: (h[0], h[1], "cache:" + h[2]) for k, h in zip(sigs, hits) if h}
+    todo = [k for k in clusters if k not in cached]
+    ex = dict(examples or {})
+    if providers:
+        missing = [k for k in todo if not ex.get(k)]
+        picked = await asyncio.gather(*(asyncio.to_thread(representative_examples, clusters[k]) for k in missing))
+        ex.update(zip(missing, picked))
+    batches = _pack(todo, ex, cfg.batch_size, cfg.batch_tokens) if providers else [[k] for k in todo]
+    out = dict(cached)
+    for part in await asyncio.gather(*(run(b, ex) for b in batches)):
+        out.update(part)
+    late = time.monotonic() >= end
+    if any(k not in out for k in todo):
+        # one c-TF-IDF pass over all clusters labels every cluster no provider named
+        py = await asyncio.to_thread(python_label_clusters, clusters)
+        out.update({k: (*py[k], "python") for k in todo if k not in out})
+    if cfg.cache:
+        # Python labels are not stored, so adding an API key later still gets LLM names
+        from storage.db import put_cached_labels
+        new = [(sigs[k], *out[k]) for k in todo if out[k][2] != "python"]
+        if new: put_cached_labels(new, *_cache_model(cfg), ttl_days=cfg.cache_ttl_days)
+    if report is not None:
+        by_source = {}
+        for _, _, src in out.values(): by_source[src] = by_source.get(src, 0) + 1
+        report.update(counts, clusters=len(out), cache_hits=len(cached),
+                      seconds=round(time.perf_counter() - t0, 2), by_source=by_source,
+                      errors_by_source=errors_by_source, deadline_hit=late,
+                      breaker_open=sorted(s for s in health if health[s].open),
+                      latency={s: round(h.latency, 2) for s, h in health.items() if h.latency is not None})
+    return {k: out[k] for k in clusters}
+
+def label_clusters(clusters: Dict[str, List[str]], cfg: Optional[LabelConfig] = None,
+                   providers: Optional[List[Tuple[str, Provider]]] = None,
+                   report: Optional[Dict] = None,
+                   examples: Optional[Dict[str, List[str]]] = None) -> Dict[str, Tuple[str,str,str]]:
+    """Synchronous entry point for ``alabel_clusters``.
+
+    Runs on a process-wide background event loop so the pooled async clients
+    (and their keep-alive connections) are reused across calls and reruns.
+    """
+    return asyncio.run_coroutine_threadsafe(alabel_clusters(clusters, cfg, providers, report, examples),
+                                            _background_loop()).result()
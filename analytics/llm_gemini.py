@@ -1,5 +1,6 @@
-import os, re, random, json
+import os, re, json
 from typing import List, Tuple
+from analytics.examples import representative_examples
 from google import genai
 from google.genai import types
 
@@ -8,9 +9,7 @@ _api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 _client = genai.Client(api_key=_api_key)
 
 def _pick_examples(texts: List[str], k: int = 12) -> List[str]:
-    texts = [t for t in texts if isinstance(t, str) and t.strip()]
-    random.seed(42); random.shuffle(texts)
-    return [t[:280] for t in texts[:k]]
+    return representative_examples([t for t in texts if isinstance(t, str)], k=k)
 
 SYSTEM = (
     "You label IT support tickets into concise, executive-friendly 'call drivers'. "
@@ -0,0 +1,97 @@
+"""Local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+Answers every labeling prompt (single or batched, see ``llm_bridge._batch_prompt``)
+with JSON titles built from the most frequent example words, after optional
+latency, with optional failures (HTTP 500) and hangs (for timeouts), so batch
+labeling can be exercised offline.
+
+    python -m analytics.mock_llm --clusters 80 --latency 0.5 --fail-rate 0.1
+    python -m analytics.mock_llm --clusters 100 --batch-size 20
+"""
+import json, random, re, threading, time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+def _title(prompt: str) -> str:
+    words = [w for w in re.findall(r"[a-z]{4,}", prompt.lower())
+             if w not in {"examples", "trimmed", "title", "rationale", "return", "json", "labels", "entry", "cluster"}]
+    top = [w for w, _ in Counter(words).most_common(2)]
+    return " ".join(top).title() or "Misc Requests"
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fail_rate = 0.0
+    hang_rate = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404); return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.hang_rate and random.random() < self.hang_rate:
+            time.sleep(3600); return
+        if self.latency: time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.send_error(500); return
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+        why = "Mock label from the most frequent words."
+        parts = re.split(r"^### Cluster (\d+)$", prompt, flags=re.M)
+        if len(parts) > 1:
+            content = json.dumps({"labels": [{"id": int(i), "title": _title(p), "rationale": why}
+                                             for i, p in zip(parts[1::2], parts[2::2])]})
+        else:
+            content = json.dumps({"title": _title(prompt), "rationale": why})
+        out = json.dumps({
+            "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+def serve(latency: float = 0.0, fail_rate: float = 0.0, hang_rate: float = 0.0,
+          host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock in a daemon thread; returns ``(server, base_url)`` for ``LabelConfig.openai_base_url``."""
+    handler = type("Handler", (_Handler,), {"latency": latency, "fail_rate": fail_rate, "hang_rate": hang_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+if __name__ == "__main__":
+    import argparse, os
+    from analytics.llm_bridge import LabelConfig, label_clusters
+
+    ap = argparse.ArgumentParser(description="Benchmark batch cluster labeling against a local mock")
+    ap.add_argument("--clusters", type=int, default=80)
+    ap.add_argument("--latency", type=float, default=0.5)
+    ap.add_argument("--fail-rate", type=float, default=0.1)
+    ap.add_argument("--hang-rate", type=float, default=0.0)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=20.0)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--batch-size", type=int, default=1, help="clusters per request")
+    a = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    server, url = serve(latency=a.latency, fail_rate=a.fail_rate, hang_rate=a.hang_rate)
+    clusters = {f"cluster_{i}": [f"vpn{i % 7} tunnel drops again", f"vpn{i % 7} tunnel cannot connect"] * 5
+                for i in range(a.clusters)}
+    try:
+        report = {}
+        labels = label_clusters(clusters, LabelConfig(provider="openai", openai_base_url=url, concurrency=a.concurrency,
+                                                      rate_per_sec=a.rate, burst=a.concurrency, timeout=a.timeout,
+                                                      batch_size=a.batch_size),
+                                report=report)
+        print(f"{report['clusters']} clusters in {report['seconds']}s, {report['requests']} requests "
+              f"(sequential ≈ {a.clusters * a.latency:.0f}s) | {report['by_source']} | "
+              f"timeouts {report['timeouts']}, errors {report['errors']}, hedged {report['hedged']}, "
+              f"breaker open {report['breaker_open'] or 'none'}")
+    finally:
+        server.shutdown()
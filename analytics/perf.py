@@ -0,0 +1,66 @@
+import math, re, sys, threading
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (NaN where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024*1024 if sys.platform == "darwin" else 1024), 1)
+
+def _status_mb(field: str) -> float:
+    """``VmRSS`` / ``VmHWM`` from /proc/self/status in MB (NaN off Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            m = re.search(rf"^{field}:\s+(\d+) kB", f.read(), re.M)
+    except OSError:
+        return float("nan")
+    return int(m.group(1)) / 1024 if m else float("nan")
+
+class PeakRSS:
+    """Peak RSS over one step, not the process lifetime.
+
+    ``with PeakRSS() as m: ...`` then ``m.peak_mb`` is the highest RSS seen inside
+    the block and ``m.delta_mb`` how far it rose above the RSS at entry. Both are
+    process-wide: memory allocated meanwhile by other threads (other Streamlit
+    sessions) counts too. On Linux a background thread samples ``VmRSS`` every
+    ``interval`` seconds, and a rise of the kernel's high-water mark ``VmHWM``
+    during the block catches a new process peak between samples (the mark is only
+    read, never reset, so concurrent and enclosing measurements stay valid).
+    Elsewhere ``peak_mb`` is the lifetime peak and ``delta_mb`` its growth during
+    the block, a lower bound.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._seen = max(self._seen, _status_mb("VmRSS"))
+
+    def __enter__(self):
+        self.start = _status_mb("VmRSS")
+        self._exact = not math.isnan(self.start)
+        if self._exact:
+            self._hwm, self._seen = _status_mb("VmHWM"), self.start
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, name="peak-rss", daemon=True)
+            self._thread.start()
+        else:
+            self._seen = peak_rss_mb()
+        return self
+
+    def __exit__(self, *exc):
+        if self._exact:
+            self._stop.set()
+            self._thread.join()
+            peak = max(self._seen, _status_mb("VmRSS"))
+            hwm = _status_mb("VmHWM")
+            if hwm > self._hwm: peak = max(peak, hwm)   # the process set a new peak inside the block
+            self.peak_mb = round(peak, 1)
+            self.delta_mb = round(self.peak_mb - self.start, 1)
+        else:
+            self.peak_mb = peak_rss_mb()
+            self.delta_mb = round(self.peak_mb - self._seen, 1)
+        return False
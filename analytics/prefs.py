@@ -1,12 +1,25 @@
 import os, yaml
 DEFAULT_PREFS = {
   "llm_provider": "auto",   # auto, gemini, openai, off
+  "llm_concurrency": 8,      # clusters labeled at once
+  "llm_rate_per_sec": 5,     # provider requests per second
+  "llm_batch_size": 10,      # clusters packed into one labeling request
+  "llm_deadline_s": 120,     # labeling run budget; Python labels after it
+  "label_cache_similarity": 80,  # % MinHash similarity to reuse a stored cluster label; 0 = off
+  "label_cache_ttl_days": 30,
   "min_cluster_size": 25,
   "target_other_pct": 12,
   "include_other": False,
-  "vectorizer": "tfidf",      # tfidf or hashing
+  "vectorizer": "tfidf",      # tfidf, hashing or projection
   "max_features": 30000,       # features for Tfidf/Hashing vectorizers
+  "featurize_jobs": 1,         # worker processes for the hashing vectorizer
   "svd_batch_size": 0,         # 0 = fit all at once
+  "svd_memory_mb": 0,          # >0 = out-of-core SVD, dense chunks capped at this size
+  "feature_cache_mb": 2048,    # on-disk cache of vectorized features (0 = off)
+  "upload_cache_mb": 4096,     # on-disk cache of parsed / normalized uploads (0 = uncapped)
+  "cluster_sample_size": 0,    # >0 = fit clusters on a stratified sample, assign the rest
+  "cluster_sample_check": False, # also fit on all texts and report the sample fit's agreement (ARI)
+  "reuse_cluster_model": False, # assign new tickets with the saved cluster model (refit on drift)
   "cost_per_min": 1.20,
   "deflection_pct": 35,
 }
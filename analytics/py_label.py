@@ -1,7 +1,10 @@
-import re, pandas as pd
-from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np, pandas as pd
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 import yake
+from analytics.textnorm import text_features
 
 # Canonical IT buckets → synonyms
 CANON = {
@@ -29,24 +32,6 @@ please need issue help error problem user request ticket desk service still usin
 http https x000d attach attachment screenshot etc link click
 """.split())
 
-def _tokens(s: str):
-    s = s.lower()
-    s = re.sub(r"_x\d{4}_"," ",s)
-    s = re.sub(r"[^a-z0-9\s]"," ",s)
-    toks = [t for t in s.split() if len(t)>2 and t not in STOPWORDS]
-    return toks
-
-def _score_against_canon(tokens):
-    cnt = Counter(tokens)
-    best_label, best_score = None, 0
-    for label, keys in CANON.items():
-        score = sum(cnt[k] for k in keys if k in cnt)
-        # also partials
-        score += sum(v for k,v in cnt.items() if any(k.startswith(p) for p in keys))
-        if score > best_score:
-            best_label, best_score = label, score
-    return best_label, best_score
-
 def _yake_keywords(texts, topk=5):
     kw = yake.KeywordExtractor(lan="en", n=1, top=topk)
     joined = " ".join(texts)[:50000]
@@ -56,25 +41,108 @@ def _yake_keywords(texts, topk=5):
     except Exception:
         return []
 
+def _class_matrix(groups: List[List[str]]):
+    """Cluster × term counts over words and adjacent-word bigrams, from one tokenization pass.
+
+    Columns are the corpus vocabulary (``vocab``) followed by the bigrams
+    (``pairs``, encoded ``left_id * len(vocab) + right_id``). Short words and
+    ``STOPWORDS`` are dropped before bigrams are formed.
+    """
+    owner = np.repeat(np.arange(len(groups)), [len(g) for g in groups])
+    tf = text_features(pd.Series([t for g in groups for t in g], dtype=object))
+    vocab, V = tf.vocab, len(tf.vocab)
+    keep = (pd.Series(vocab, dtype=object).str.len().to_numpy() > 2) & ~pd.Index(vocab).isin(STOPWORDS)
+    sel = keep[tf.token_ids]
+    ids, rows = tf.token_ids[sel].astype(np.int64), tf.token_rows[sel]
+    cls = owner[rows]
+    same = rows[1:] == rows[:-1]
+    pairs, inv = np.unique(ids[:-1][same] * V + ids[1:][same], return_inverse=True)
+    C = sparse.hstack([sparse.csr_matrix((np.ones(len(ids)), (cls, ids)), shape=(len(groups), V)),
+                       sparse.csr_matrix((np.ones(len(inv)), (cls[1:][same], inv)), shape=(len(groups), len(pairs)))])
+    return C.tocsr(), vocab, pairs
+
+def _ctfidf(C) -> sparse.csr_matrix:
+    """Class-based TF-IDF: term frequency within the cluster × ``log(1 + avg cluster length / corpus frequency)``."""
+    tf = sparse.diags(1.0 / np.maximum(C.sum(axis=1).A1, 1)) @ C
+    idf = np.log1p(C.sum(axis=1).mean() / np.maximum(C.sum(axis=0).A1, 1))
+    return (tf @ sparse.diags(idf)).tocsr()
+
+def distinctive_terms(clusters: Dict[str, List[str]], topk: int = 20, min_share: float = 0.7,
+                      floor: float = 0.15) -> Dict[str, List[str]]:
+    """Top ``topk`` c-TF-IDF words and bigrams per cluster, stopwords removed.
+
+    Only terms with at least ``min_share`` of their occurrences inside the cluster
+    count (the idf alone is mild with few clusters), and terms weighing less than
+    ``floor`` × the cluster's best term are dropped, so neither vocabulary shared
+    across clusters nor one-off words pad out the list.
+    """
+    keys = list(clusters)
+    groups = [[t for t in clusters[k] if isinstance(t,str)] for k in keys]
+    if not any(groups): return {k: [] for k in keys}
+    C, vocab, pairs = _class_matrix(groups)
+    share = C @ sparse.diags(1.0 / np.maximum(C.sum(axis=0).A1, 1))
+    W = _ctfidf(C).multiply(share >= min_share).tocsr()
+    return {k: _top_terms(W.getrow(i), vocab, pairs, topk, floor) for i, k in enumerate(keys)}
+
+def _top_terms(row, vocab, pairs, topk: int, floor: float = 0.0) -> List[str]:
+    """Highest-weighted terms of one ``_ctfidf`` row (none under ``floor`` × the best), bigrams decoded."""
+    V, top = len(vocab), []
+    floor = floor * row.data.max() if row.nnz else 0.0
+    # English stopwords are skipped here (kept in the matrix only for lexicon words like "call")
+    for c in row.indices[np.argsort(-row.data, kind="stable")]:
+        if row[0, c] < floor: break
+        t = vocab[c] if c < V else vocab[pairs[c - V] // V] + " " + vocab[pairs[c - V] % V]
+        if not any(w in ENGLISH_STOP_WORDS for w in t.split()): top.append(t)
+        if len(top) == topk: break
+    return top
+
+def _canon_matrix(vocab) -> sparse.csr_matrix:
+    """Word × CANON label: 1 for an exact keyword, +1 for any keyword prefix (sorted-vocab range lookup)."""
+    order = np.argsort(vocab)
+    srt = vocab[order]
+    lookup = pd.Index(vocab)
+    rows, cols, vals = [], [], []
+    for j, keys in enumerate(CANON.values()):
+        exact = lookup.get_indexer(keys)
+        exact = exact[exact >= 0]
+        pref = np.unique(np.concatenate([order[bisect_left(srt, k):bisect_left(srt, k + "\uffff")] for k in keys]))
+        for ids in (exact, pref):
+            rows.append(ids); cols.append(np.full(len(ids), j)); vals.append(np.ones(len(ids)))
+    return sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(len(vocab), len(CANON)))
+
+def python_label_clusters(clusters: Dict[str, List[str]]) -> Dict[str, Tuple[str,str]]:
+    """Label every cluster in one pass; returns ``{key: (title, rationale)}``.
+
+    CANON lexicon hits are scored for all clusters as one sparse product. The
+    rest are titled by their top class-based TF-IDF terms: term frequency within
+    the cluster × ``log(1 + avg cluster length / corpus frequency)``, so words
+    common to every cluster drop out. YAKE is the last resort.
+    """
+    keys = list(clusters)
+    groups = [[t for t in clusters[k] if isinstance(t,str)] for k in keys]
+    out, rest = {}, list(range(len(keys)))
+    C = None
+    if any(groups):
+        C, vocab, pairs = _class_matrix(groups)
+        V = len(vocab)
+        canon = (C[:, :V] @ _canon_matrix(vocab)).toarray()
+        labels = list(CANON)
+        rest = []
+        for i, k in enumerate(keys):
+            j = int(canon[i].argmax())
+            if canon[i, j] >= 2:
+                out[k] = (labels[j], "Matched IT lexicon by keyword frequency.")
+            else:
+                rest.append(i)
+        W = _ctfidf(C)
+    for i in rest:
+        top = _top_terms(W.getrow(i), vocab, pairs, 4) if C is not None else []
+        if not top:
+            top = _yake_keywords(groups[i], topk=4)
+        title = " / ".join(top[:4]) if top else "Other"
+        out[keys[i]] = (title.title(), "Auto-labeled by keyword salience.")
+    return {k: out[k] for k in keys}
+
 def python_label_for_cluster(texts):
-    texts = [t for t in texts if isinstance(t,str)]
-    toks = []
-    for t in texts:
-        toks.extend(_tokens(t))
-    label, score = _score_against_canon(toks)
-    if label and score>=2:
-        rationale = "Matched IT lexicon by keyword frequency."
-        return label, rationale
-    # fall back to TF-IDF top terms
-    try:
-        vec = TfidfVectorizer(stop_words="english", ngram_range=(1,2), max_features=1000)
-        X = vec.fit_transform(texts)
-        sums = X.sum(axis=0).A1
-        terms = vec.get_feature_names_out()
-        top = [t for _,t in sorted(zip(sums,terms), reverse=True)[:4] if t not in STOPWORDS]
-    except Exception:
-        top = []
-    if not top:
-        top = _yake_keywords(texts, topk=4)
-    title = " / ".join(top[:4]) if top else "Other"
-    return title.title(), "Auto-labeled by keyword salience."
+    return python_label_clusters({0: texts})[0]
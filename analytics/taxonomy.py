@@ -1,6 +1,9 @@
 import os, yaml, re
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Any, Pattern
+import numpy as np, pandas as pd
+import scipy.sparse as sp
+from analytics.textnorm import TextFeatures, normalize_text, phrase_hits
 
 @dataclass
 class TaxEntry:
@@ -75,11 +78,14 @@ def compile_taxonomy_entries(entries: List[TaxEntry]) -> List[CompiledTaxEntry]:
         phrase_pats: List[Tuple[Pattern, float]] = []
         token_pats: List[Tuple[Pattern, float]] = []
         for syn, wt in e.synonyms.items():
+            norm = normalize_text(syn)   # match against the shared normalized text
+            if not norm:
+                continue
             if " " in syn:
-                phrase_pats.append((re.compile(re.escape(syn)), wt))
+                phrase_pats.append((re.compile(re.escape(norm)), wt))
             else:
                 base = 0.25 if syn in GENERIC_WEAK else 1.0
-                token_pats.append((re.compile(r"\b" + re.escape(syn) + r"\b"), wt * base))
+                token_pats.append((re.compile(r"\b" + re.escape(norm) + r"\b"), wt * base))
         compiled.append(
             CompiledTaxEntry(
                 name=e.name,
@@ -115,7 +121,7 @@ GENERIC_WEAK = {"access"}  # downweight generic token
 
 
 def match_taxonomy(text: str, entries: List[CompiledTaxEntry]) -> Tuple[str, float]:
-    t = (text or "").lower()
+    t = normalize_text(text or "")
 
     phrase_hits = {e.name: 0.0 for e in entries}
     token_hits = {e.name: 0.0 for e in entries}
@@ -147,6 +153,84 @@ def match_taxonomy(text: str, entries: List[CompiledTaxEntry]) -> Tuple[str, flo
     best = max(scores.items(), key=lambda kv: kv[1]) if scores else ("Other",0.0)
     return (best[0], float(best[1]))
 
+@dataclass
+class TaxonomyScorer:
+    """Taxonomy compiled to a synonym × entry weight matrix for batch scoring."""
+    names: List[str]
+    phrases: List[List[str]]   # single-word synonyms (normalized tokens), matched as whole tokens
+    substrings: List[str]      # multi-word synonyms, matched as substrings like match_taxonomy
+    weights: sp.csr_matrix     # (phrases + substrings) × entry (phrase ×3, GENERIC_WEAK ×0.25 already applied)
+    bias: np.ndarray           # 2 × entry: score shift when a network-AP / access-prov pattern hits
+    n_syn: int
+
+
+def build_taxonomy_scorer(entries: List[TaxEntry]) -> TaxonomyScorer:
+    """Same weighting and bias rules as ``match_taxonomy``, as matrices."""
+    tokens: Dict[Tuple[str, ...], int] = {}
+    subs: Dict[str, int] = {}
+    tok_cells, sub_cells = [], []
+    for j, e in enumerate(entries):
+        for syn, wt in e.synonyms.items():
+            norm = normalize_text(syn)
+            if not norm:
+                continue
+            if " " in syn:
+                sub_cells.append((subs.setdefault(norm, len(subs)), j, 3 * wt))
+            else:
+                w = wt * (0.25 if syn in GENERIC_WEAK else 1.0)
+                tok_cells.append((tokens.setdefault(tuple(norm.split()), len(tokens)), j, w))
+    n_syn = len(tokens)
+    cells = tok_cells + [(n_syn + i, j, w) for i, j, w in sub_cells]
+    rows, cols, vals = (list(c) for c in zip(*cells)) if cells else ([], [], [])
+    weights = sp.csr_matrix((vals, (rows, cols)), shape=(n_syn + len(subs), len(entries)))
+    bias = np.zeros((2, len(entries)))
+    for j, e in enumerate(entries):
+        if "Network Hardware" in e.name or "Interface" in e.name: bias[0, j] += 5
+        if "Access Provisioning" in e.name: bias[0, j] -= 2; bias[1, j] += 4
+    return TaxonomyScorer(names=[e.name for e in entries], phrases=[list(t) for t in tokens],
+                          substrings=list(subs), weights=weights, bias=bias, n_syn=n_syn)
+
+
+def score_taxonomy(tf: TextFeatures, scorer: TaxonomyScorer, top_k: int = 3) -> pd.DataFrame:
+    """Score every ticket against every taxonomy entry with one sparse matmul.
+
+    Single-word synonyms come from the token index (``phrase_hits``);
+    multi-word synonyms and the bias patterns keep ``match_taxonomy``'s substring
+    semantics through vectorized ``str.contains`` passes. Returns
+    ``taxonomy_match``/``taxonomy_score`` (best entry, ties to the first entry as
+    in ``match_taxonomy``), ``taxonomy_margin`` (best minus runner-up) and
+    ``taxonomy_match_i``/``taxonomy_score_i`` for ranks ``2..top_k``.
+    """
+    n = len(tf.norm)
+    if not scorer.names:
+        return pd.DataFrame({"taxonomy_match": "Other", "taxonomy_score": 0.0, "taxonomy_margin": 0.0}, index=tf.norm.index)
+    rows, ph = phrase_hits(tf, scorer.phrases)
+    sub_rows, sub_ph = [], []
+    for i, sub in enumerate(scorer.substrings):
+        hit = np.flatnonzero(tf.norm.str.contains(sub, regex=False).to_numpy(dtype=bool, na_value=False))
+        sub_rows.append(hit); sub_ph.append(np.full(len(hit), scorer.n_syn + i))
+    rows = np.concatenate([rows] + sub_rows); ph = np.concatenate([ph] + sub_ph)
+    occ = sp.csr_matrix((np.ones(len(rows)), (rows, ph)), shape=(n, scorer.weights.shape[0]))
+    scores = np.asarray((occ @ scorer.weights).todense())
+    flags = np.column_stack([
+        tf.norm.str.contains("|".join(NETWORK_AP_PATTERNS), regex=True).to_numpy(dtype=bool, na_value=False),
+        tf.norm.str.contains("|".join(ACCESS_PROV_PATTERNS), regex=True).to_numpy(dtype=bool, na_value=False),
+    ]).astype(float)
+    scores += flags @ scorer.bias
+    k = min(top_k, len(scorer.names))
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    top = np.take_along_axis(scores, order, axis=1)
+    names = np.array(scorer.names, dtype=object)
+    out = pd.DataFrame({
+        "taxonomy_match": names[order[:, 0]],
+        "taxonomy_score": top[:, 0],
+        "taxonomy_margin": top[:, 0] - top[:, 1] if k > 1 else top[:, 0],
+    }, index=tf.norm.index)
+    for r in range(1, k):
+        out[f"taxonomy_match_{r+1}"] = names[order[:, r]]
+        out[f"taxonomy_score_{r+1}"] = top[:, r]
+    return out
+
 # ---------- Backwards compatibility shim ----------
 def map_text_to_taxonomy(text: str, entries: List[CompiledTaxEntry]):
     """Compatibility alias – forwards to match_taxonomy()."""
@@ -1,5 +1,8 @@
-import re, pandas as pd, yaml
+import re, numpy as np, pandas as pd, yaml
+from dataclasses import dataclass
 from functools import lru_cache
+from typing import List, Tuple
+from analytics.textnorm import TextFeatures, normalize_text, phrase_hits, text_features
 
 @lru_cache(maxsize=1)
 def load_rules(path="analytics/rules.yaml"):
@@ -11,35 +14,62 @@ def load_rules(path="analytics/rules.yaml"):
     for rule in rules:
         words = [re.escape(w) for w in rule["keywords"]]
         pattern = re.compile(r"\b(?:" + "|".join(words) + r")\b", flags=re.IGNORECASE)
-        compiled.append({"name": rule["name"], "regex": pattern})
+        compiled.append({"name": rule["name"], "regex": pattern, "keywords": list(rule["keywords"])})
     return compiled
 
-def normalize_text(s):
-    s = "" if s is None else str(s)
-    s = s.lower()
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
 def _safe_text_series(df: pd.DataFrame, col_name: str) -> pd.Series:
     if col_name in df.columns:
         return df[col_name].astype(str).fillna("")
     return pd.Series([""] * len(df), index=df.index, dtype="string")
 
+@dataclass
+class RuleEngine:
+    """All rule keywords compiled for one pass of ``textnorm.phrase_hits``."""
+    names: List[str]
+    phrases: List[List[str]]   # normalized keyword tokens
+    phrase_rule: np.ndarray    # rule index of each phrase
+
+def compile_rule_engine(rules) -> RuleEngine:
+    phrases, owner = [], []
+    for ri, rule in enumerate(rules):
+        for kw in rule["keywords"]:
+            toks = normalize_text(kw).split()
+            if toks:
+                phrases.append(toks); owner.append(ri)
+    return RuleEngine(names=[r["name"] for r in rules], phrases=phrases,
+                      phrase_rule=np.array(owner, dtype=np.int64))
+
+def match_rules(tf: TextFeatures, engine: RuleEngine) -> Tuple[np.ndarray, np.ndarray]:
+    """Scan every ticket once against all rules.
+
+    Returns ``(rule_idx, hits)``: the winning (lowest) rule index per row, ``-1``
+    if none matched, and the number of tickets each rule matched. Matching whole
+    tokens of normalized text is the same as the ``\\b...\\b`` regexes it replaces.
+    """
+    n_rows, n_rules = len(tf.norm), len(engine.names)
+    rows, ph = phrase_hits(tf, engine.phrases)
+    rule = engine.phrase_rule[ph]
+    rule_idx = np.full(n_rows, n_rules, dtype=np.int64)
+    np.minimum.at(rule_idx, rows, rule)   # first rule wins
+    pairs = np.unique(rows * n_rules + rule)
+    hits = np.bincount(pairs % n_rules, minlength=n_rules)
+    rule_idx[rule_idx == n_rules] = -1
+    return rule_idx, hits
+
 def derive_drivers(df, rules):
-    """Derive ticket drivers by applying cached regex patterns."""
+    """Derive ticket drivers with a single-pass multi-keyword rule engine (first rule wins)."""
     df = df.copy()
     cols = {c.lower().strip(): c for c in df.columns}
     sd_col = cols.get("short_description") or cols.get("short description") or "short_description"
     d_col  = cols.get("description") or "description"
     sd = _safe_text_series(df, sd_col)
     desc = _safe_text_series(df, d_col)
-    text_joined = (sd + " " + desc).map(normalize_text)
+    tf = text_features(sd + " " + desc)
 
-    df["driver"] = "Other"
-    for rule in rules:
-        mask = text_joined.str.contains(rule["regex"], na=False)
-        df.loc[mask & (df["driver"] == "Other"), "driver"] = rule["name"]
+    engine = compile_rule_engine(rules)
+    rule_idx, hits = match_rules(tf, engine)
+    names = np.array(engine.names + ["Other"], dtype=object)
+    df["driver"] = names[rule_idx]   # -1 picks the trailing "Other"
 
     summary = (
         df.groupby("driver")
@@ -47,6 +77,8 @@ def derive_drivers(df, rules):
         .reset_index(name="tickets")
         .sort_values("tickets", ascending=False)
     )
+    # tickets mentioning each rule's keywords, including those claimed by an earlier rule
+    summary["keyword_hits"] = summary["driver"].map(dict(zip(engine.names, hits.tolist()))).fillna(0).astype(int)
     return df, summary
 
 def estimate_aht_minutes(df, default=8.0):
@@ -0,0 +1,168 @@
+import hashlib, re, threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+import numpy as np, pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# One canonical normalization for rules, clustering, taxonomy and labeling:
+# lowercase, drop Excel artifacts like _x000D_, keep [a-z0-9], collapse whitespace.
+EXCEL_ARTIFACT = r"_x\d{4}_"
+NON_ALNUM = r"[^a-z0-9\s]"
+CACHE_MB = 512      # text_features cache budget, shared by every session of the process
+
+def normalize_text(s) -> str:
+    """Scalar version of ``normalize_series`` (for keywords, synonyms, single tickets)."""
+    s = "" if s is None else str(s)
+    s = s.lower()
+    s = re.sub(EXCEL_ARTIFACT, " ", s)
+    s = re.sub(NON_ALNUM, " ", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+def normalize_series(s: pd.Series) -> pd.Series:
+    """Vectorized normalization on Arrow-backed strings (no per-row Python calls)."""
+    s = s.astype("string[pyarrow]").fillna("")
+    return (s.str.lower()
+             .str.replace(EXCEL_ARTIFACT, " ", regex=True)
+             .str.replace(NON_ALNUM, " ", regex=True)
+             .str.replace(r"\s+", " ", regex=True)
+             .str.strip())
+
+def fingerprint(s: pd.Series) -> str:
+    """Content hash of a text column (values only, index ignored)."""
+    h = pd.util.hash_pandas_object(s.astype(str), index=False).to_numpy()
+    return hashlib.blake2b(h.tobytes(), digest_size=16).hexdigest()
+
+def _arrow(s: pd.Series) -> pa.Array:
+    arr = pa.array(s)
+    return arr.combine_chunks() if isinstance(arr, pa.ChunkedArray) else arr
+
+@dataclass
+class TextFeatures:
+    """Normalized text plus a flat token-id encoding (CSR style).
+
+    Tokens of row ``i`` are ``vocab[token_ids[offsets[i]:offsets[i+1]]]``.
+    """
+    fingerprint: str
+    norm: pd.Series
+    vocab: np.ndarray
+    token_ids: np.ndarray
+    offsets: np.ndarray
+
+    @property
+    def token_rows(self) -> np.ndarray:
+        """Row number of every entry of ``token_ids``."""
+        return np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+
+    def ids_of(self, words: Sequence[str]) -> np.ndarray:
+        """Vocabulary ids of ``words`` (-1 for words that never occur)."""
+        lookup = pd.Index(self.vocab)
+        return lookup.get_indexer(list(words))
+
+_CACHE: "OrderedDict[str, Tuple[TextFeatures, int]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()   # Streamlit sessions run on separate threads
+
+def _nbytes(tf: TextFeatures) -> int:
+    return int(tf.norm.memory_usage(deep=True) + tf.vocab.nbytes + tf.token_ids.nbytes + tf.offsets.nbytes
+               + sum(len(w) for w in tf.vocab))
+
+def text_features(texts: pd.Series) -> TextFeatures:
+    """Normalize and tokenize ``texts`` once per dataset (LRU-cached by content fingerprint).
+
+    The cache holds at most ``CACHE_MB`` (the newest entry is always kept).
+    """
+    fp = fingerprint(texts)
+    with _CACHE_LOCK:
+        if fp in _CACHE:
+            _CACHE.move_to_end(fp)
+            return _CACHE[fp][0]
+    norm = normalize_series(texts)
+    norm.index = texts.index
+    lists = pc.utf8_split_whitespace(_arrow(norm))
+    flat = lists.flatten()
+    offsets = lists.offsets.to_numpy()
+    offsets = offsets - offsets[0]
+    enc = pc.dictionary_encode(flat).combine_chunks() if isinstance(flat, pa.ChunkedArray) else pc.dictionary_encode(flat)
+    tf = TextFeatures(
+        fingerprint=fp,
+        norm=norm,
+        vocab=enc.dictionary.to_numpy(zero_copy_only=False).astype(object),
+        token_ids=enc.indices.to_numpy().astype(np.int32),
+        offsets=offsets.astype(np.int64),
+    )
+    with _CACHE_LOCK:
+        _CACHE[fp] = (tf, _nbytes(tf))
+        _CACHE.move_to_end(fp)
+        total = sum(n for _, n in _CACHE.values())
+        while total > CACHE_MB * 2**20 and len(_CACHE) > 1:
+            total -= _CACHE.popitem(last=False)[1][1]
+    return tf
+
+def phrase_hits(tf: TextFeatures, phrases: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Find every row containing each phrase (a list of normalized words) as whole tokens.
+
+    The phrases form a trie (one state per distinct phrase prefix) and every corpus
+    position advances through it one token per pass: a transition is the number
+    ``state * (V+1) + word`` and is resolved for all positions with one vectorized
+    ``searchsorted``. Keys stay below ``prefixes × (V+1)``, however long the phrases.
+    Returns unique ``(row, phrase_index)`` pairs.
+    """
+    words = sorted({w for p in phrases for w in p})
+    gid = tf.ids_of(words)
+    base = len(words) + 1
+    local = np.zeros(len(tf.vocab), dtype=np.int64)   # corpus id → local id (0 = irrelevant word)
+    present = gid >= 0
+    local[gid[present]] = np.flatnonzero(present) + 1
+    wid = {w: i + 1 for i, w in enumerate(words)}
+    occurs = dict(zip(words, present))
+
+    # trie: transition key → child state; state → phrases ending there (shared by identical phrases)
+    trans, ends = {}, {}
+    for pi, p in enumerate(phrases):
+        if not p or not all(occurs[w] for w in p):
+            continue   # empty phrase, or a word that never occurs in the corpus
+        state = 0
+        for w in p:
+            state = trans.setdefault(state * base + wid[w], len(trans) + 1)
+        ends.setdefault(state, []).append(pi)
+    longest = max((len(p) for p in phrases if p), default=0)
+    if not ends:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    keys = np.array(sorted(trans), dtype=np.int64)
+    child = np.array([trans[k] for k in keys.tolist()], dtype=np.int64)
+    cnt = np.zeros(len(trans) + 1, dtype=np.int64)
+    for st, mb in ends.items(): cnt[st] = len(mb)
+    start = np.cumsum(cnt) - cnt
+    flat_members = np.zeros(cnt.sum(), dtype=np.int64)
+    for st, mb in ends.items(): flat_members[start[st]:start[st] + len(mb)] = mb
+
+    ids = local[tf.token_ids]
+    row = tf.token_rows
+    out_rows, out_ph = [], []
+    state = np.zeros(len(ids), dtype=np.int64)
+    valid = np.ones(len(ids), dtype=bool)
+    for n in range(1, longest + 1):
+        m = len(ids) - n + 1
+        if m <= 0: break
+        # advance the match starting at p by the token at p+n-1, within the same row
+        valid = valid[:m] & (ids[n-1:] > 0) & (row[n-1:] == row[:m])
+        pos = np.flatnonzero(valid)
+        key = state[pos] * base + ids[n-1:][pos]
+        at = np.searchsorted(keys, key).clip(max=len(keys) - 1)
+        found = keys[at] == key
+        valid[pos[~found]] = False
+        pos, nxt = pos[found], child[at[found]]
+        state = np.zeros(m, dtype=np.int64)
+        state[pos] = nxt
+        done = cnt[nxt] > 0
+        hit, r = nxt[done], row[pos[done]]
+        # expand each hit to every phrase ending in its state
+        rep = cnt[hit]
+        within = np.arange(rep.sum()) - np.repeat(np.cumsum(rep) - rep, rep)
+        out_rows.append(np.repeat(r, rep))
+        out_ph.append(flat_members[np.repeat(start[hit], rep) + within])
+        if not valid.any(): break
+    r, p = np.concatenate(out_rows), np.concatenate(out_ph)
+    uniq = np.unique(r * len(phrases) + p)
+    return uniq // len(phrases), uniq % len(phrases)
@@ -1,11 +1,26 @@
-import pandas as pd
+import numpy as np, pandas as pd
+from pandas.tseries.api import guess_datetime_format
 from typing import Tuple, Dict, Optional
-import re
+import re, time, warnings
 
 REQUIRED_ANY = [["short_description"], ["description"]]
 OPTIONAL_NUMERIC = ["u_aht_minutes","AHT","avg_handle_time","reopen_count"]
 OPTIONAL_BOOL = ["sla_breached","SLA breach","SLA Breach"]
 DATE_HINTS = re.compile(r"(open|create|log|start|request|fulfill|resolve|close)", re.I)
+DATE_SAMPLE = 500      # values sampled per column to infer its format
+DATE_MIN_RATE = 0.8    # share of the sample that must parse for a column to be used
+DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S", "%d-%m-%Y", "%d-%b-%Y %H:%M:%S", "%d-%b-%Y",
+]
+
+# compaction: low-cardinality labels → categoricals, ticket text → Arrow-backed strings
+CATEGORICAL_COLS = ["assignment_group","u_site","u_persona","category","subcategory","priority","source"]
+TEXT_COLS = ["short_description","description","text"]
+DERIVED_COLS = ["aht_min","reopen_count_num","sla_breached_bool"]
+CATEGORY_MAX_RATIO = 0.5
 
 def _first_existing(cands, df):
     for c in cands:
@@ -22,32 +37,117 @@ def _norm_text_cols(df):
     df["description"] = df["description"].astype(str).fillna("")
     return df
 
-def _parse_dates(df):
+def _infer_date_format(s: pd.Series) -> Optional[str]:
+    """Settle on one explicit format from a sample of ``s``.
+
+    Returns ``"datetime"`` if the column is already parsed, a strptime format,
+    ``"mixed"`` as a last resort, or ``None`` when the sample doesn't look like dates.
+    A format that parses only part of the sample is still returned when it covers
+    ``DATE_MIN_RATE`` of it; ``_to_datetime`` then re-parses the misses as ``"mixed"``.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s): return "datetime"
+    if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s): return None
+    vals = s.dropna()
+    if isinstance(vals.dtype, pd.CategoricalDtype): vals = pd.Series(vals.cat.categories)
+    vals = vals.astype(str).str.strip()
+    vals = vals[vals != ""]
+    if vals.empty: return None
+    sample = vals.sample(DATE_SAMPLE, random_state=0) if len(vals) > DATE_SAMPLE else vals
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")   # dayfirst guesses warn; the sample decides below
+        cands = [guess_datetime_format(v) for v in sample.head(5)]
+    cands = list(dict.fromkeys([c for c in cands if c] + DATE_FORMATS))
+    best, best_rate = None, 0.0
+    for fmt in cands:
+        rate = pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean()
+        if rate > best_rate: best, best_rate = fmt, rate
+        if rate == 1.0: break
+    if best_rate >= DATE_MIN_RATE: return best
+    if pd.to_datetime(sample, format="mixed", errors="coerce").notna().mean() >= DATE_MIN_RATE: return "mixed"
+    return None
+
+def _parse_with_fallback(s: pd.Series, fmt: str) -> pd.Series:
+    """Parse with ``fmt``; values it misses (a second format in the column) go through ``"mixed"``."""
+    out = pd.to_datetime(s, format=fmt, errors="coerce")
+    if fmt == "mixed": return out
+    miss = out.isna() & s.notna() & s.astype(str).str.strip().ne("")
+    if miss.any():
+        out[miss] = pd.to_datetime(s[miss], format="mixed", errors="coerce")
+    return out
+
+def _to_datetime(s: pd.Series, fmt: str) -> pd.Series:
+    if fmt == "datetime": return s
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # parse each distinct value once, then broadcast through the codes
+        cats = _parse_with_fallback(pd.Series(s.cat.categories.astype(str)), fmt)
+        codes = s.cat.codes.to_numpy()
+        out = cats.to_numpy()[codes.clip(min=0)]
+        out[codes < 0] = np.datetime64("NaT")
+        return pd.Series(out, index=s.index)
+    return _parse_with_fallback(s, fmt)
+
+def _parse_dates(df, notes=None):
+    timings = {}
+    parsed = {}   # column → parsed Series, so opened/resolved candidates are parsed only once
+
+    def parse(c):
+        if c not in parsed:
+            t0 = time.perf_counter()
+            fmt = _infer_date_format(df[c])
+            parsed[c] = _to_datetime(df[c], fmt) if fmt else None
+            timings[str(c)] = {"format": fmt, "seconds": round(time.perf_counter() - t0, 4)}
+        return parsed[c]
+
+    def best_of(cands):
+        best = None
+        for c in cands:
+            s = parse(c)
+            if s is not None and s.notna().sum() > 0:
+                best = s if best is None else s.combine_first(best)
+        return best
+
     # opened_dt
     if "opened_dt" in df.columns:
-        df["opened_dt"] = pd.to_datetime(df["opened_dt"], format="mixed", errors="coerce")
+        s = parse("opened_dt")
+        df["opened_dt"] = s if s is not None else pd.NaT
     else:
-        date_cols = [c for c in df.columns if DATE_HINTS.search(c)]
-        best = None
-        for c in date_cols:
-            s = pd.to_datetime(df[c], format="mixed", errors="coerce")
-            if s.notna().sum() > 0:
-                best = s if best is None else s.combine_first(best)
+        best = best_of([c for c in df.columns if DATE_HINTS.search(str(c))])
         df["opened_dt"] = best if best is not None else pd.NaT
     # resolved_dt
     if "resolved_dt" in df.columns:
-        df["resolved_dt"] = pd.to_datetime(df["resolved_dt"], format="mixed", errors="coerce")
+        s = parse("resolved_dt")
+        df["resolved_dt"] = s if s is not None else pd.NaT
     else:
-        cands = [c for c in df.columns if re.search(r"(resolve|close|complete)", c, re.I)]
-        best = None
-        for c in cands:
-            s = pd.to_datetime(df[c], format="mixed", errors="coerce")
-            if s.notna().sum() > 0:
-                best = s if best is None else s.combine_first(best)
+        best = best_of([c for c in df.columns if re.search(r"(resolve|close|complete)", str(c), re.I)])
         df["resolved_dt"] = best if best is not None else pd.NaT
+    if notes is not None: notes["date_parse"] = timings
+    return df
+
+def compact_frame(df: pd.DataFrame, notes: Optional[Dict] = None, drop_raw: bool = True) -> pd.DataFrame:
+    """Shrink a normalized frame in place of holding Python object strings.
+
+    Raw source columns the pipeline never reads are dropped (their names go to
+    ``notes["dropped_columns"]`` so they can be reloaded from the upload cache).
+    """
+    from analytics.mapping import CANONICAL
+    if drop_raw:
+        keep = set(CANONICAL) | set(TEXT_COLS) | set(DERIVED_COLS) | set(OPTIONAL_NUMERIC) | set(OPTIONAL_BOOL)
+        dropped = [c for c in df.columns if c not in keep]
+        df = df.drop(columns=dropped)
+        if notes is not None: notes["dropped_columns"] = [str(c) for c in dropped]
+    n = max(len(df), 1)
+    for c in CATEGORICAL_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            if df[c].nunique(dropna=True) / n < CATEGORY_MAX_RATIO:
+                df[c] = df[c].astype(str).where(df[c].notna()).astype("category")
+    for c in TEXT_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("string[pyarrow]")
+    if notes is not None:
+        notes["memory_mb"] = round(df.memory_usage(deep=True).sum() / 2**20, 1)
     return df
 
-def validate_and_normalize(df: pd.DataFrame, mapping: Optional[Dict]=None) -> Tuple[pd.DataFrame, Dict]:
+def validate_and_normalize(df: pd.DataFrame, mapping: Optional[Dict]=None, compact: bool = True) -> Tuple[pd.DataFrame, Dict]:
     notes = {}
     df = df.copy() if df is not None else pd.DataFrame()
 
@@ -64,7 +164,7 @@ def validate_and_normalize(df: pd.DataFrame, mapping: Optional[Dict]=None) -> Tu
             if c in df.columns:
                 df[c] = (df[c].astype(str).str.strip().str.lower()
                          .map({"true":True,"yes":True,"y":True,"1":True,"false":False,"no":False,"n":False,"0":False}))
-        df = _parse_dates(df)
+        df = _parse_dates(df, notes)
         return df
 
     df = prep(df)
@@ -84,4 +184,6 @@ def validate_and_normalize(df: pd.DataFrame, mapping: Optional[Dict]=None) -> Tu
     notes["rows"] = len(df)
     notes["empty_text_pct"] = round(float(df["text"].str.strip().eq("").mean())*100,2)
 
+    if compact:
+        df = compact_frame(df, notes)
     return df, notes
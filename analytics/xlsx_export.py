@@ -34,6 +34,7 @@ def build_processed_workbook(refined: pd.DataFrame) -> bytes:
         df["Final Driver"] = df["driver"].astype(str)
     if "Final Driver" not in df.columns:
         df["Final Driver"] = "Other"
+    df["Final Driver"] = df["Final Driver"].astype(str)   # categoricals would list unobserved drivers
 
     # Month column
     if "opened_dt" in df.columns:
@@ -20,6 +20,8 @@ def pick_project_files() -> list[str]:
         ".streamlit/config.toml",
         "analytics/*.py",
         "analytics/*.yaml",
+        "connectors/*.py",
+        "storage/*.py",
         "pages/*.py",
     ]
     files = []
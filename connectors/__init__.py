@@ -0,0 +1,16 @@
+import os
+from typing import Dict, Optional
+from connectors.base import Connector, read_frame
+from connectors.files import CsvConnector, ParquetConnector, JsonlConnector
+
+CONNECTORS: Dict[str, Connector] = {}
+for _c in (CsvConnector(), ParquetConnector(), JsonlConnector()):
+    for _ext in _c.extensions:
+        CONNECTORS[_ext] = _c
+
+def get_connector(filename: str) -> Optional[Connector]:
+    """Connector registered for the file's extension, or ``None`` (e.g. .xlsx)."""
+    return CONNECTORS.get(os.path.splitext(str(filename))[1].lower())
+
+__all__ = ["Connector", "CsvConnector", "ParquetConnector", "JsonlConnector",
+           "CONNECTORS", "get_connector", "read_frame"]
@@ -0,0 +1,49 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+from analytics.ingest import CHUNK_ROWS, compact_columns
+from analytics.perf import PeakRSS
+
+def _rewind(src) -> None:
+    if hasattr(src, "seek"): src.seek(0)
+
+class Connector(ABC):
+    """Chunked reader for one bulk-input format.
+
+    Subclasses implement ``columns`` (header only, no data read) and
+    ``iter_chunks`` (raw DataFrame chunks with source column names); the
+    Upload page maps columns afterwards, on the frame ``read_frame`` returns.
+    """
+    name = "base"
+    extensions: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def columns(self, src) -> List[str]:
+        """Source column names, read from the header only."""
+
+    @abstractmethod
+    def iter_chunks(self, src, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Raw ``chunk_rows``-row chunks with source column names."""
+
+def read_frame(connector: Connector, src, source: str = "", chunk_rows: int = CHUNK_ROWS) -> Tuple[pd.DataFrame, Dict]:
+    """Read a whole input into one compact raw frame; stats mirror ``analytics.ingest.read_workbook``."""
+    with PeakRSS() as mem:
+        t0 = time.perf_counter()
+        _rewind(src)
+        chunks = [compact_columns(c) for c in connector.iter_chunks(src, chunk_rows=chunk_rows)]
+        df = pd.concat(chunks, ignore_index=True, sort=False) if chunks else pd.DataFrame(columns=connector.columns(src))
+        del chunks
+        df["source"] = source or connector.name
+        # categories differing across chunks fall back to object on concat
+        df = compact_columns(df)
+        secs = time.perf_counter() - t0
+    stats = {
+        "sheet": source or connector.name,
+        "rows": len(df),
+        "seconds": round(secs, 2),
+        "rows_per_sec": round(len(df) / secs, 1) if secs > 0 else None,
+        "peak_rss_mb": mem.peak_mb,
+        "rss_delta_mb": mem.delta_mb,
+    }
+    return df, stats
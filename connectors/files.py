@@ -0,0 +1,86 @@
+import json
+from typing import Iterator, List
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from analytics.ingest import CHUNK_ROWS
+from connectors.base import Connector, _rewind
+
+class CsvConnector(Connector):
+    """CSV via pyarrow's streaming reader (multi-threaded parsing, block by block)."""
+    name = "csv"
+    extensions = (".csv",)
+    block_size = 16 << 20
+
+    def _open(self, src):
+        # every column is read as text: types inferred from the first block would make a
+        # later block that disagrees (ids turning alphanumeric, ...) fail mid-stream; the
+        # validator does the typing once the whole column is in
+        names = self.columns(src)
+        _rewind(src)
+        return pacsv.open_csv(src, read_options=pacsv.ReadOptions(block_size=self.block_size),
+                              convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in names}))
+
+    def columns(self, src) -> List[str]:
+        return list(pacsv.open_csv(src, read_options=pacsv.ReadOptions(block_size=self.block_size)).schema.names)
+
+    def iter_chunks(self, src, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        # pyarrow yields blocks by size; re-slice so callers still see ~chunk_rows rows
+        buf = []
+        for batch in self._open(src):
+            buf.append(batch.to_pandas())
+            if sum(len(b) for b in buf) >= chunk_rows:
+                yield pd.concat(buf, ignore_index=True)
+                buf = []
+        if buf:
+            yield pd.concat(buf, ignore_index=True)
+
+class ParquetConnector(Connector):
+    name = "parquet"
+    extensions = (".parquet", ".pq")
+
+    def columns(self, src) -> List[str]:
+        return list(pq.ParquetFile(src).schema_arrow.names)
+
+    def iter_chunks(self, src, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        for batch in pq.ParquetFile(src).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+
+def _display_value(v):
+    # ServiceNow exports reference/choice fields as {"display_value": ..., "value": ..., "link": ...}
+    if isinstance(v, dict):
+        return v.get("display_value", v.get("value"))
+    return v
+
+class JsonlConnector(Connector):
+    """ServiceNow JSONL dumps: one record per line, optionally wrapped as ``{"result": {...}}``."""
+    name = "jsonl"
+    extensions = (".jsonl", ".ndjson")
+
+    @staticmethod
+    def _record(line):
+        rec = json.loads(line)
+        if isinstance(rec, dict) and isinstance(rec.get("result"), dict):
+            rec = rec["result"]
+        return {k: _display_value(v) for k, v in rec.items()}
+
+    @staticmethod
+    def _lines(src):
+        for line in src:
+            if isinstance(line, bytes): line = line.decode("utf-8")
+            if line.strip(): yield line
+
+    def columns(self, src) -> List[str]:
+        first = next(self._lines(src), None)
+        return list(self._record(first).keys()) if first else []
+
+    def iter_chunks(self, src, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        buf = []
+        for line in self._lines(src):
+            buf.append(self._record(line))
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame.from_records(buf)
+                buf = []
+        if buf:
+            yield pd.DataFrame.from_records(buf)
@@ -0,0 +1,101 @@
+"""Local stand-in for the ServiceNow Table API.
+
+Serves deterministic synthetic incidents with ``sysparm_offset``/``sysparm_limit``
+paging, ``X-Total-Count`` and optional latency / transient failures, so the
+Table API connector can be exercised (throughput, retries, back-pressure) offline.
+
+    python -m connectors.mock_servicenow --rows 200000 --latency 0.05 --fail-rate 0.02
+"""
+import json, random, threading, time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+SAMPLES = [
+    ("Password reset needed", "User locked out after password expiry, requests reset"),
+    ("VPN not connecting", "GlobalProtect fails to connect from home network"),
+    ("Outlook not syncing", "Mailbox stuck, emails not arriving in inbox"),
+    ("Access request", "Please add to group for shared drive access"),
+    ("Laptop battery issue", "Laptop battery drains quickly and does not charge"),
+    ("Printer offline", "Floor 3 printer shows offline, cannot print"),
+    ("Teams audio problem", "No audio in Teams meetings, microphone not detected"),
+    ("Status of ticket", "Where is my request, please share ETA"),
+]
+GROUPS = ["Service Desk", "Network Ops", "EUC", "IAM", "Messaging"]
+SITES = ["London", "Pune", "Austin", "Singapore"]
+
+def make_incident(i: int) -> Dict:
+    rnd = random.Random(i)
+    sd, desc = SAMPLES[rnd.randrange(len(SAMPLES))]
+    opened = datetime(2024, 1, 1) + timedelta(minutes=rnd.randrange(525600))
+    return {
+        "number": f"INC{i:07d}",
+        "short_description": sd,
+        "description": desc,
+        "assignment_group": GROUPS[rnd.randrange(len(GROUPS))],
+        "u_site": SITES[rnd.randrange(len(SITES))],
+        "priority": f"{rnd.randint(1, 4)} - Normal",
+        "opened_at": opened.strftime("%Y-%m-%d %H:%M:%S"),
+        "resolved_at": (opened + timedelta(minutes=rnd.randint(5, 600))).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+class _Handler(BaseHTTPRequestHandler):
+    rows = 10000
+    latency = 0.0
+    fail_rate = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/api/now/table/"):
+            self.send_error(404); return
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.send_response(503); self.send_header("Retry-After", "0"); self.end_headers(); return
+        if self.latency: time.sleep(self.latency)
+        q = parse_qs(url.query)
+        offset = int(q.get("sysparm_offset", ["0"])[0])
+        limit = int(q.get("sysparm_limit", ["1000"])[0])
+        fields = [f for f in q.get("sysparm_fields", [""])[0].split(",") if f]
+        recs = [make_incident(i) for i in range(offset, min(offset + limit, self.rows))]
+        if fields:
+            recs = [{k: r.get(k, "") for k in fields} for r in recs]
+        body = json.dumps({"result": recs}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Total-Count", str(self.rows))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve(rows: int = 10000, latency: float = 0.0, fail_rate: float = 0.0,
+          host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock in a daemon thread; returns ``(server, base_url)``. Call ``server.shutdown()`` when done."""
+    handler = type("Handler", (_Handler,), {"rows": rows, "latency": latency, "fail_rate": fail_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="mock-servicenow", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    import argparse
+    from connectors.servicenow import ServiceNowConfig, load_normalized
+
+    ap = argparse.ArgumentParser(description="Benchmark the Table API connector against a local mock")
+    ap.add_argument("--rows", type=int, default=50000)
+    ap.add_argument("--page-size", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    a = ap.parse_args()
+
+    server, url = serve(rows=a.rows, latency=a.latency, fail_rate=a.fail_rate)
+    try:
+        t0 = time.perf_counter()
+        df, notes = load_normalized(ServiceNowConfig(instance_url=url, page_size=a.page_size,
+                                                     concurrency=a.concurrency, backoff=0.01))
+        secs = time.perf_counter() - t0
+        print(f"{notes['rows']} rows in {secs:.2f}s → {notes['rows']/secs:,.0f} rows/s")
+    finally:
+        server.shutdown()
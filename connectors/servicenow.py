@@ -0,0 +1,175 @@
+import asyncio, queue, random, threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+import httpx
+import pandas as pd
+from analytics.ingest import CHUNK_ROWS
+from connectors.base import Connector
+from connectors.files import _display_value
+
+TABLE_PATH = "/api/now/table/{table}"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+@dataclass
+class ServiceNowConfig:
+    instance_url: str                      # e.g. https://acme.service-now.com
+    table: str = "incident"
+    user: Optional[str] = None
+    password: Optional[str] = None
+    token: Optional[str] = None            # OAuth bearer token, used instead of basic auth
+    query: str = ""                        # sysparm_query, e.g. "opened_at>=javascript:gs.daysAgo(30)"
+    fields: List[str] = field(default_factory=list)
+    page_size: int = 1000
+    concurrency: int = 4                   # pages in flight (and pooled connections)
+    prefetch: int = 8                      # fetched pages buffered ahead of the consumer
+    max_retries: int = 5
+    backoff: float = 0.5                   # seconds, doubled per attempt (+ jitter)
+    timeout: float = 60.0
+    max_rows: Optional[int] = None
+
+def _client(cfg: ServiceNowConfig) -> httpx.AsyncClient:
+    headers = {"Accept": "application/json"}
+    auth = None
+    if cfg.token:
+        headers["Authorization"] = f"Bearer {cfg.token}"
+    elif cfg.user:
+        auth = httpx.BasicAuth(cfg.user, cfg.password or "")
+    return httpx.AsyncClient(
+        base_url=cfg.instance_url.rstrip("/"),
+        headers=headers,
+        auth=auth,
+        timeout=cfg.timeout,
+        limits=httpx.Limits(max_connections=cfg.concurrency, max_keepalive_connections=cfg.concurrency),
+    )
+
+def _params(cfg: ServiceNowConfig, offset: int, limit: int) -> Dict[str, str]:
+    p = {
+        "sysparm_offset": str(offset),
+        "sysparm_limit": str(limit),
+        "sysparm_display_value": "true",
+        "sysparm_exclude_reference_link": "true",
+    }
+    if cfg.query: p["sysparm_query"] = cfg.query
+    if cfg.fields: p["sysparm_fields"] = ",".join(cfg.fields)
+    return p
+
+async def fetch_page(client: httpx.AsyncClient, cfg: ServiceNowConfig, offset: int,
+                     limit: Optional[int] = None) -> Tuple[List[Dict], Optional[int]]:
+    """One page with retry/backoff; returns ``(records, X-Total-Count or None)``."""
+    limit = limit or cfg.page_size
+    for attempt in range(cfg.max_retries + 1):
+        try:
+            resp = await client.get(TABLE_PATH.format(table=cfg.table), params=_params(cfg, offset, limit))
+            if resp.status_code in RETRY_STATUS and attempt < cfg.max_retries:
+                wait = resp.headers.get("Retry-After")
+                await asyncio.sleep(float(wait) if wait and wait.isdigit() else cfg.backoff * 2**attempt * (1 + random.random()))
+                continue
+            resp.raise_for_status()
+            total = resp.headers.get("X-Total-Count")
+            rows = [{k: _display_value(v) for k, v in r.items()} for r in resp.json().get("result", [])]
+            return rows, (int(total) if total and total.isdigit() else None)
+        except (httpx.TransportError, httpx.TimeoutException):
+            if attempt >= cfg.max_retries: raise
+            await asyncio.sleep(cfg.backoff * 2**attempt * (1 + random.random()))
+    raise RuntimeError(f"ServiceNow page at offset {offset} failed after {cfg.max_retries} retries")
+
+async def _produce(cfg: ServiceNowConfig, put) -> None:
+    """Fetch pages ``concurrency`` at a time and hand them to ``put`` in offset order."""
+    async with _client(cfg) as client:
+        rows, total = await fetch_page(client, cfg, 0)
+        if cfg.max_rows is not None:
+            total = min(total, cfg.max_rows) if total is not None else cfg.max_rows
+            rows = rows[:total]
+        await put(rows)
+        offset, done = len(rows), len(rows) < cfg.page_size
+        while not done and (total is None or offset < total):
+            offsets = [offset + i*cfg.page_size for i in range(cfg.concurrency)]
+            if total is not None: offsets = [o for o in offsets if o < total]
+            pages = await asyncio.gather(*(fetch_page(client, cfg, o) for o in offsets))
+            for o, (page, _) in zip(offsets, pages):
+                if total is not None: page = page[:max(0, total - o)]
+                if page: await put(page)
+                if len(page) < cfg.page_size: done = True
+            offset = offsets[-1] + cfg.page_size
+
+class _Stopped(Exception):
+    pass
+
+def iter_records(cfg: ServiceNowConfig) -> Iterator[List[Dict]]:
+    """Synchronous page iterator with back-pressure.
+
+    The async fetcher runs in a background thread and blocks once ``prefetch``
+    pages are waiting, so a slow consumer throttles the API calls.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max(1, cfg.prefetch))
+    end, err, stop = object(), [], threading.Event()
+
+    async def put(page):
+        if stop.is_set(): raise _Stopped()
+        await asyncio.to_thread(q.put, page)
+
+    def run():
+        try:
+            asyncio.run(_produce(cfg, put))
+        except _Stopped:
+            pass
+        except Exception as e:  # surfaced to the consumer below
+            err.append(e)
+        finally:
+            q.put(end)
+
+    t = threading.Thread(target=run, name="servicenow-fetch", daemon=True)
+    t.start()
+    try:
+        while True:
+            page = q.get()
+            if page is end: break
+            yield page
+    finally:
+        # consumer stopped early: unblock the producer so the thread can exit
+        stop.set()
+        while t.is_alive():
+            try: q.get(timeout=0.1)
+            except queue.Empty: pass
+    if err: raise err[0]
+
+class ServiceNowConnector(Connector):
+    """Table API connector; ``src`` is a ``ServiceNowConfig``."""
+    name = "servicenow"
+
+    def columns(self, src: ServiceNowConfig) -> List[str]:
+        if src.fields: return list(src.fields)
+        async def first():
+            async with _client(src) as client:
+                rows, _ = await fetch_page(client, src, 0, limit=1)
+                return list(rows[0].keys()) if rows else []
+        return asyncio.run(first())
+
+    def iter_chunks(self, src: ServiceNowConfig, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        buf = []
+        for page in iter_records(src):
+            buf.extend(page)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame.from_records(buf)
+                buf = []
+        if buf:
+            yield pd.DataFrame.from_records(buf)
+
+def load_normalized(cfg: ServiceNowConfig, mapping: Optional[Dict[str, Optional[str]]] = None,
+                    chunk_rows: int = CHUNK_ROWS) -> Tuple[pd.DataFrame, Dict]:
+    """Stream Table API pages through ``validate_and_normalize`` chunk by chunk."""
+    from analytics.mapping import propose_mapping
+    from analytics.validator import compact_frame, validate_and_normalize
+    conn = ServiceNowConnector()
+    parts, rows, empty = [], 0, 0.0
+    for chunk in conn.iter_chunks(cfg, chunk_rows=chunk_rows):
+        chunk["source"] = f"servicenow:{cfg.table}"
+        mapping = mapping or propose_mapping(list(chunk.columns))
+        # compact once at the end: per-chunk categoricals would not survive the concat
+        norm, n = validate_and_normalize(chunk, mapping=mapping, compact=False)
+        parts.append(norm)
+        rows += n["rows"]
+        empty += n["empty_text_pct"] * n["rows"]
+    df = pd.concat(parts, ignore_index=True, sort=False) if parts else pd.DataFrame()
+    notes = {"rows": rows, "empty_text_pct": round(empty / rows, 2) if rows else 0.0, "mapping": mapping}
+    return compact_frame(df, notes), notes
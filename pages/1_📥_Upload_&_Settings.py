@@ -1,35 +1,75 @@
-import os, streamlit as st, pandas as pd, pathlib
+import os, streamlit as st, pathlib
 from analytics.validator import validate_and_normalize
 from analytics.tcd import estimate_aht_minutes
 from analytics.prefs import save_prefs, load_prefs
 from analytics.mapping import CANONICAL, propose_mapping
+from analytics.ingest import read_workbook
+from connectors import CONNECTORS, get_connector, read_frame
+from connectors.servicenow import ServiceNowConfig, load_normalized
+from storage.db import artifact_key, content_hash, latest_key, load_frame, save_frame, set_latest
 
 st.markdown("<style>" + pathlib.Path("assets/theme.css").read_text() + "</style>", unsafe_allow_html=True)
 st.title("📥 Upload & Settings")
 
 prefs = load_prefs()
+upload_cache_mb = int(st.session_state.get("upload_cache_mb", prefs.get("upload_cache_mb", 4096)) or 0)
 
-with st.expander("Upload ServiceNow Excel", expanded=True):
-    f = st.file_uploader("Upload .xlsx (sheets with required columns will be detected)", type=["xlsx"])
+with st.expander("Upload ServiceNow Export", expanded=True):
+    f = st.file_uploader("Upload .xlsx (sheets with required columns will be detected) or a CSV / Parquet / JSONL extract",
+                         type=["xlsx"] + [e.lstrip(".") for e in CONNECTORS])
     st.caption("Minimum required: short_description, description (you can map columns below). Optional: assignment_group, persona, site, opened date, AHT, SLA Breach, Reopen, etc.")
 
+def _use_dataset(df, notes, mapping):
+    st.session_state["df"] = df
+    st.session_state["aht_guess"] = estimate_aht_minutes(df, default=8.0)
+    st.session_state["column_map"] = mapping
+    # raw columns dropped by compaction can be reloaded on demand from the raw upload cache
+    st.session_state["raw_key"] = notes.get("raw_key")
+    st.session_state["dropped_columns"] = notes.get("dropped_columns", [])
+    # mark analysis dirty so Drivers page recomputes once
+    for k in ["refined","freq_all","fig_top"]: st.session_state.pop(k, None)
+    st.session_state["dirty"] = True
+    src = " (from cache)" if notes.get("cached") else ""
+    st.success(f"Loaded rows: {notes['rows']} | Empty text: {notes['empty_text_pct']}%{src}")
+
+def _load(file_hash, raw, mapping):
+    # normalized result is content-addressed by workbook hash + mapping
+    key = artifact_key(file_hash, mapping)
+    hit = load_frame(key)
+    if hit is not None:
+        df, notes = hit
+        notes["cached"] = True
+        set_latest(key)
+    else:
+        df, notes = validate_and_normalize(raw, mapping=mapping)
+        notes["raw_key"] = artifact_key(file_hash, kind="raw")
+        save_frame(key, df, notes, mark_latest=True, max_mb=upload_cache_mb)
+    _use_dataset(df, notes, mapping)
+
 if f:
-    xl = pd.ExcelFile(f)
-    dfs = []
-    used = []
-    for name in xl.sheet_names:
-        tmp = xl.parse(name)
-        test_map = propose_mapping(tmp.columns)
-        if test_map.get("short_description") and test_map.get("description"):
-            tmp["source"] = name
-            dfs.append(tmp)
-            used.append(name)
-    all_cols = sorted({c for d in dfs for c in d.columns}) if dfs else []
+    file_hash = content_hash(f.getvalue())
+    raw_key = artifact_key(file_hash, kind="raw")
+    hit = load_frame(raw_key)
+    if hit is not None:
+        raw, meta = hit
+        used, ingest_stats = meta.get("used", []), meta.get("stats", [])
+    elif get_connector(f.name):
+        # flat exports (CSV / Parquet / JSONL) skip the Excel parser entirely
+        raw, stat = read_frame(get_connector(f.name), f, source=f.name)
+        m = propose_mapping(list(raw.columns))
+        used, ingest_stats = ([f.name], [stat]) if (m.get("short_description") and m.get("description")) else ([], [])
+        if used: save_frame(raw_key, raw, {"used": used, "stats": ingest_stats}, max_mb=upload_cache_mb)
+    else:
+        # header-first: only sheets with ticket text are streamed, the rest are never parsed
+        raw, used, ingest_stats = read_workbook(f)
+        if used: save_frame(raw_key, raw, {"used": used, "stats": ingest_stats}, max_mb=upload_cache_mb)
+    all_cols = sorted(c for c in raw.columns if isinstance(c, str))
     auto = propose_mapping(all_cols)
-    raw = pd.concat(dfs, ignore_index=True, sort=False) if dfs else pd.DataFrame()
 
     if used:
         st.success(f"Found sheets: {', '.join(used)}")
+        st.caption(" | ".join(f"{s['sheet']}: {s['rows']:,} rows @ {s['rows_per_sec'] or 0:,.0f} rows/s, peak {s['peak_rss_mb']} MB (+{s.get('rss_delta_mb', 0)})"
+                              for s in ingest_stats))
     else:
         st.error("No valid sheets found")
 
@@ -44,22 +84,28 @@ if f:
 
         c1,c2 = st.columns(2)
         if c1.button("Quick Load (use auto-mapping)"):
-            df, notes = validate_and_normalize(raw, mapping=auto)
-            st.session_state["df"] = df
-            st.session_state["aht_guess"] = estimate_aht_minutes(df, default=8.0)
-            st.session_state["column_map"] = auto
-            # mark analysis dirty so Drivers page recomputes once
-            for k in ["refined","freq_all","fig_top"]: st.session_state.pop(k, None)
-            st.session_state["dirty"] = True
-            st.success(f"Loaded rows: {notes['rows']} | Empty text: {notes['empty_text_pct']}%")
+            _load(file_hash, raw, auto)
         if c2.button("Apply Mapping & Load Data"):
-            df, notes = validate_and_normalize(raw, mapping=col_map)
-            st.session_state["df"] = df
-            st.session_state["aht_guess"] = estimate_aht_minutes(df, default=8.0)
-            st.session_state["column_map"] = col_map
-            for k in ["refined","freq_all","fig_top"]: st.session_state.pop(k, None)
-            st.session_state["dirty"] = True
-            st.success(f"Loaded rows: {notes['rows']} | Empty text: {notes['empty_text_pct']}%")
+            _load(file_hash, raw, col_map)
+elif st.session_state.get("df") is None and latest_key():
+    if st.button("↩️ Restore last loaded dataset (cached)"):
+        df, notes = load_frame(latest_key())
+        notes["cached"] = True
+        _use_dataset(df, notes, st.session_state.get("column_map"))
+
+with st.expander("Pull from ServiceNow (Table API)", expanded=False):
+    c1,c2,c3 = st.columns(3)
+    sn_url  = c1.text_input("Instance URL", value=os.environ.get("SN_INSTANCE_URL",""), placeholder="https://acme.service-now.com")
+    sn_user = c2.text_input("User", value=os.environ.get("SN_USER",""))
+    sn_pwd  = c3.text_input("Password", type="password")
+    c4,c5 = st.columns(2)
+    sn_query = c4.text_input("sysparm_query (optional)", placeholder="opened_at>=javascript:gs.daysAgo(90)")
+    sn_max   = c5.number_input("Max rows (0=all)", 0, 5000000, 0, 10000)
+    if st.button("Fetch incidents") and sn_url:
+        with st.spinner("Fetching incident pages…"):
+            df, notes = load_normalized(ServiceNowConfig(instance_url=sn_url, user=sn_user or None, password=sn_pwd or None,
+                                                         query=sn_query, max_rows=int(sn_max) or None))
+        _use_dataset(df, notes, notes.get("mapping"))
 
 with st.expander("Intelligence & Keys", expanded=True):
     c1,c2,c3 = st.columns(3)
@@ -70,18 +116,35 @@ with st.expander("Intelligence & Keys", expanded=True):
         if gem: os.environ["GEMINI_API_KEY"] = gem; os.environ["GOOGLE_API_KEY"] = gem
         if oa:  os.environ["OPENAI_API_KEY"] = oa
         st.success("Keys applied to this session. Not saved unless you choose Save with keys.")
+    c1,c2,c3 = st.columns(3)
+    prefs["llm_concurrency"] = c1.number_input("Labeling requests in flight", 1, 64, int(prefs.get("llm_concurrency",8)), 1)
+    prefs["llm_rate_per_sec"] = c2.number_input("LLM requests per second", 1, 100, int(prefs.get("llm_rate_per_sec",5)), 1)
+    prefs["llm_batch_size"] = c3.number_input("Clusters per LLM request", 1, 50, int(prefs.get("llm_batch_size",10)), 1)
+    c1,c2,c3 = st.columns(3)
+    prefs["label_cache_similarity"] = c1.slider("Reuse stored label at cluster similarity ≥ % (0 = off)", 0, 100, int(prefs.get("label_cache_similarity",80)), 5)
+    prefs["label_cache_ttl_days"] = c2.number_input("Stored labels expire after (days)", 1, 365, int(prefs.get("label_cache_ttl_days",30)), 1)
+    prefs["llm_deadline_s"] = c3.number_input("Labeling time budget (s)", 10, 3600, int(prefs.get("llm_deadline_s",120)), 10)
 
 with st.expander("Clustering & Coverage", expanded=True):
     c1,c2,c3 = st.columns(3)
     prefs["min_cluster_size"] = c1.number_input("Min cluster size (HDBSCAN)", 10, 200, int(prefs.get("min_cluster_size",25)), 5)
     prefs["target_other_pct"] = c2.slider("Target 'Other' max %", 0, 50, int(prefs.get("target_other_pct",12)), 1)
     prefs["include_other"] = c3.checkbox("Include 'Other' in outputs", value=bool(prefs.get("include_other",False)))
+    prefs["cluster_sample_size"] = c1.number_input("Fit on sample of N texts (0=all)", 0, 500000, int(prefs.get("cluster_sample_size",0)), 5000)
+    prefs["cluster_sample_check"] = c3.checkbox("Check sample fit against a full fit", value=bool(prefs.get("cluster_sample_check",False)),
+                                                help="also clusters all texts once and reports the adjusted Rand index (slow; for tuning the sample size)")
+    prefs["reuse_cluster_model"] = c2.checkbox("Reuse saved cluster model (refit on drift)", value=bool(prefs.get("reuse_cluster_model",False)))
 
 with st.expander("Vectorization", expanded=False):
     c1,c2,c3 = st.columns(3)
-    prefs["vectorizer"] = c1.selectbox("Vectorizer", ["tfidf","hashing"], index=["tfidf","hashing"].index(prefs.get("vectorizer","tfidf")))
+    prefs["vectorizer"] = c1.selectbox("Vectorizer", ["tfidf","hashing","projection"], index=["tfidf","hashing","projection"].index(prefs.get("vectorizer","tfidf")),
+                                       help="projection: hashing + sparse random projection, no fit (fastest, for exploration)")
     prefs["max_features"] = c2.number_input("Max features", 1000, 200000, int(prefs.get("max_features",30000)), 1000)
+    prefs["featurize_jobs"] = c1.number_input("Hashing worker processes", 1, 64, int(prefs.get("featurize_jobs",1)), 1)
     prefs["svd_batch_size"] = c3.number_input("SVD batch size (0=all)", 0, 10000, int(prefs.get("svd_batch_size",0)), 100)
+    prefs["svd_memory_mb"] = c3.number_input("SVD memory ceiling MB (0=off)", 0, 65536, int(prefs.get("svd_memory_mb",0)), 256)
+    prefs["feature_cache_mb"] = c2.number_input("Feature cache MB (0=off)", 0, 262144, int(prefs.get("feature_cache_mb",2048)), 512)
+    prefs["upload_cache_mb"] = c1.number_input("Upload cache MB (0=uncapped)", 0, 262144, int(prefs.get("upload_cache_mb",4096)), 512)
 
 with st.expander("Save / Load Settings", expanded=False):
     c1,c2 = st.columns(2)
@@ -96,7 +159,7 @@ with st.expander("Save / Load Settings", expanded=False):
             path = save_prefs(prefs=prefs, include_keys=True)
             st.warning(f"Saved with keys to {path} (be cautious with git).")
 
-for k in ["llm_provider","min_cluster_size","target_other_pct","include_other","vectorizer","max_features","svd_batch_size"]:
+for k in ["llm_provider","llm_concurrency","llm_rate_per_sec","llm_batch_size","llm_deadline_s","label_cache_similarity","label_cache_ttl_days","min_cluster_size","target_other_pct","include_other","vectorizer","max_features","featurize_jobs","svd_batch_size","svd_memory_mb","feature_cache_mb","upload_cache_mb","cluster_sample_size","cluster_sample_check","reuse_cluster_model"]:
     st.session_state[k] = prefs.get(k)
 
 st.info("Next → open **📊 Drivers & Visualization**")
@@ -1,13 +1,10 @@
-import streamlit as st, pandas as pd, plotly.express as px, pathlib
+import streamlit as st, plotly.express as px, pathlib
 from analytics.tcd import load_rules, derive_drivers
-from analytics.cluster import iterative_other_reduction
-from analytics.llm_bridge import best_label_for_cluster
-from analytics.taxonomy import (
-    load_taxonomy_entries,
-    compile_taxonomy_entries,
-    map_text_to_taxonomy,
-    match_taxonomy,
-)
+from analytics.cluster import iterative_other_reduction, assign_new, needs_refit, model_key, sweep_clustering
+from analytics.llm_bridge import LabelConfig, label_clusters
+from analytics.textnorm import text_features
+from analytics.taxonomy import load_taxonomy_entries, build_taxonomy_scorer, score_taxonomy
+from storage.db import save_model, load_model
 
 st.markdown("<style>" + pathlib.Path("assets/theme.css").read_text() + "</style>", unsafe_allow_html=True)
 st.title("📊 Drivers & Visualization")
@@ -21,10 +18,23 @@ include_other = bool(st.session_state.get("include_other", False))
 min_cluster_size = int(st.session_state.get("min_cluster_size", 25))
 target_other = float(st.session_state.get("target_other_pct", 12))/100.0
 provider = st.session_state.get("llm_provider","auto")
+llm_concurrency = int(st.session_state.get("llm_concurrency", 8) or 8)
+llm_rate = float(st.session_state.get("llm_rate_per_sec", 5) or 5)
+llm_batch = int(st.session_state.get("llm_batch_size", 10) or 1)
+llm_deadline = float(st.session_state.get("llm_deadline_s", 120) or 120)
+label_cache_sim = int(st.session_state.get("label_cache_similarity", 80) or 0)
+label_cache_ttl = float(st.session_state.get("label_cache_ttl_days", 30) or 30)
 vec_choice = st.session_state.get("vectorizer", "tfidf")
 max_features = int(st.session_state.get("max_features", 30000))
+featurize_jobs = int(st.session_state.get("featurize_jobs", 1) or 1)
+feature_cache_mb = int(st.session_state.get("feature_cache_mb", 2048) or 0)
 svd_batch_size = int(st.session_state.get("svd_batch_size", 0))
+svd_memory_mb = int(st.session_state.get("svd_memory_mb", 0) or 0)
+cluster_sample_size = int(st.session_state.get("cluster_sample_size", 0) or 0)
+cluster_sample_check = bool(st.session_state.get("cluster_sample_check", False))
+reuse_model = bool(st.session_state.get("reuse_cluster_model", False))
 use_hashing = vec_choice == "hashing"
+use_projection = vec_choice == "projection"
 dirty = st.session_state.get("dirty", False)
 refined = st.session_state.get("refined")
 freq_all = st.session_state.get("freq_all")
@@ -39,47 +49,113 @@ if refined is None or freq_all is None or fig_top is None or dirty:
         left_pct = 100.0 * (tcd_df["driver"].eq("Other").mean())
         if not include_other: freq_rules = freq_rules[freq_rules["driver"]!="Other"]
         st.write(f"Coverage after rules: **{100-left_pct:.1f}%**  |  Remaining 'Other': **{left_pct:.1f}%**")
+        st.session_state["rules_other_text"] = tcd_df.loc[tcd_df["driver"].eq("Other"), "text"]
         st.dataframe(freq_rules, use_container_width=True)
 
     # 2) Clustering + iterative reduction + Python/LLM rename (cluster names)
     with st.expander("Clustering on 'Other' + Intelligent Labeling (Python-first, LLM optional)", expanded=True):
-        refined = iterative_other_reduction(
-            tcd_df,
-            target_other_pct=target_other,
-            max_rounds=3,
-            min_cluster_size=min_cluster_size,
-            use_hashing=use_hashing,
-            max_features=max_features,
-            svd_batch_size=(svd_batch_size or None)
-        )
+        cluster_report = {}
+        key = model_key(use_hashing, max_features, use_projection)
+        saved = load_model(key) if reuse_model else None
+        # what is on disk, to save again only if this run changed it
+        loaded = (saved[0], dict(saved[0].names), saved[0].hierarchy) if saved else (None, None, None)
+        cm, refined = None, None
+        if saved:
+            # transform-only: score new tickets against the saved models, refit only on drift
+            other = tcd_df["driver"].eq("Other")
+            drivers, astats = assign_new(tcd_df.loc[other, "text"], saved[0])
+            if needs_refit(astats):
+                st.warning(f"Saved cluster model left {astats['unassigned_frac']:.0%} of 'Other' unassigned "
+                           f"(drift {astats['drift']:+.0%}) — refitting.")
+            else:
+                cm = saved[0]
+                refined = tcd_df.copy()
+                refined.loc[other, "driver"] = drivers
+                st.caption(f"Assigned {astats['rows']:,} tickets with the saved cluster model in {astats['seconds']}s "
+                           f"| unassigned {astats['unassigned_frac']:.1%} (drift {astats['drift']:+.1%})")
+        if refined is None:
+            refined = iterative_other_reduction(
+                tcd_df,
+                target_other_pct=target_other,
+                max_rounds=3,
+                min_cluster_size=min_cluster_size,
+                use_hashing=use_hashing,
+                max_features=max_features,
+                svd_batch_size=(svd_batch_size or None),
+                svd_memory_mb=(svd_memory_mb or None),
+                sample_size=(cluster_sample_size or None),
+                compare_full=cluster_sample_check,
+                n_jobs=featurize_jobs,
+                use_projection=use_projection,
+                feature_cache_mb=feature_cache_mb,
+                report=cluster_report
+            )
+            cm = cluster_report.get("model")
+        dd = cluster_report.get("dedup", {})
+        if dd:
+            st.caption(f"Deduplicated {dd['rows']:,} tickets → {dd['unique']:,} unique texts ({dd['ratio']}× fewer rows to cluster)")
+        fz = cluster_report.get("featurize", {})
+        if fz:
+            st.caption(f"Features: {fz['rows']:,} × {fz['features']:,} → {fz['components']} ({fz['svd_mode']}{'' if fz['svd_mode'] in ('projection', 'cached') else ' SVD'}) | "
+                       f"vectorize {fz['vectorize_seconds']}s, SVD {fz['svd_seconds']}s | peak RSS {fz['peak_rss_mb']} MB (+{fz.get('rss_delta_mb', 0)})")
+        for rd in cluster_report.get("rounds", []):
+            st.caption(f"Round {rd['round']+1} ({rd['mode']}, min cluster {rd['min_cluster_size']}): "
+                       f"recovered {rd['recovered']:,} of {rd['other_before']:,} 'Other' ({rd['gain']:.1%}) "
+                       f"in {rd['seconds']}s → Other {rd['other_pct']:.1f}%")
+        for i, sm in enumerate(cluster_report.get("sampling", []), 1):
+            st.caption(f"Round {i}: fit on {sm['sample']:,} of {sm['rows']:,} texts ({sm['fit_seconds']}s), "
+                       f"assigned the rest in {sm['assign_seconds']}s | self-agreement {sm['self_agreement']:.0%}, "
+                       f"noise sample {sm['noise_sample']:.1%} vs assigned {sm['noise_assigned']:.1%}"
+                       + (f" | ARI vs full fit {sm['ari_vs_full']:.2f}" if "ari_vs_full" in sm else ""))
 
         # Rename all discovered cluster_* or "Other" buckets via bridge (Python → LLM when keys present)
-        renamed = {}
-        for drv, grp in refined.groupby("driver"):
-            if drv.startswith("cluster_") or drv == "Other":
-                title, rationale, source = best_label_for_cluster(grp["text"].astype(str).tolist(),
-                                                                  provider=provider,
-                                                                  gemini_model="gemini-2.5-flash",
-                                                                  openai_model="gpt-4o-mini")
-                refined.loc[refined["driver"]==drv, "driver"] = title
-                renamed[drv] = (title, source)
+        # all clusters are labeled concurrently; each falls back to the Python labeler on failure.
+        # Prompts carry each cluster's medoid + most distinct members (picked on the SVD features).
+        clusters = {drv: grp["text"].astype(str).tolist()
+                    for drv, grp in refined.groupby("driver")
+                    if drv.startswith("cluster_") or drv == "Other"}
+        label_report = {}
+        labels = label_clusters(clusters, LabelConfig(provider=provider, concurrency=llm_concurrency,
+                                                      rate_per_sec=llm_rate, burst=llm_concurrency,
+                                                      cache=label_cache_sim > 0, cache_threshold=label_cache_sim / 100.0,
+                                                      cache_ttl_days=label_cache_ttl, batch_size=llm_batch,
+                                                      deadline=llm_deadline),
+                                report=label_report, examples=cluster_report.get("examples"))
+        renamed = {drv: (title, source) for drv, (title, _, source) in labels.items()}
+        refined["driver"] = refined["driver"].map(lambda d: renamed[d][0] if d in renamed else d)
+        if cm is not None:
+            cm.names.update({drv: title for drv, (title, _) in renamed.items() if drv.startswith("cluster_")})
 
         if renamed:
-            st.success(f"Renamed {len(renamed)} clusters (source: Python/LLM auto).")
+            st.success(f"Renamed {len(renamed)} clusters in {label_report['seconds']}s "
+                       f"with {label_report['requests']} LLM requests (sources: {label_report['by_source']}; "
+                       f"reused {label_report['cache_hits']} stored labels; timeouts {label_report['timeouts']}, errors {label_report['errors']}).")
+        if label_report.get("breaker_open"):
+            st.warning(f"LLM provider(s) {', '.join(label_report['breaker_open'])} kept failing and are paused "
+                       f"(errors: {label_report['errors_by_source']}) — check the API key or provider status.")
+        if label_report.get("deadline_hit"):
+            st.warning(f"Labeling hit its {llm_deadline:.0f}s budget; remaining clusters got Python labels.")
+        hierarchy = cluster_report.get("hierarchy")
+        if hierarchy is not None:
+            hierarchy = hierarchy.rename({drv: title for drv, (title, _) in renamed.items()})
+            if cm is not None: cm.hierarchy = hierarchy
+        elif cm is not None:
+            hierarchy = cm.hierarchy
+        st.session_state["driver_hierarchy"] = hierarchy
+        if cm is not None and (cm is not loaded[0] or cm.names != loaded[1] or cm.hierarchy is not loaded[2]):
+            save_model(key, cm, meta=cm.stats)   # next export reuses these clusters and names
 
         cov_after = 100.0*(~refined["driver"].eq("Other")).mean()
         st.write(f"Coverage after clustering+iterations: **{cov_after:.1f}%** (target Other ≤ {int(target_other*100)}%)")
 
     # 3) Taxonomy mapping + reconciliation
     with st.expander("Map to DWPNxt Taxonomy & Reconcile", expanded=True):
-        entries = compile_taxonomy_entries(load_taxonomy_entries())
-        # taxonomy score per row
-        titles, scores = [], []
-        for txt in refined["text"].astype(str).tolist():
-            t, sc = map_text_to_taxonomy(txt, entries)
-            titles.append(t); scores.append(sc)
-        refined["taxonomy_match"] = titles
-        refined["taxonomy_score"] = scores
+        scorer = build_taxonomy_scorer(load_taxonomy_entries())
+        # taxonomy score per row — all rows at once (sparse matmul over the shared token ids)
+        tx = score_taxonomy(text_features(refined["text"].astype(str)), scorer)
+        refined["taxonomy_match"] = tx["taxonomy_match"]
+        refined["taxonomy_score"] = tx["taxonomy_score"]
+        refined["taxonomy_margin"] = tx["taxonomy_margin"]
 
         # choose final driver mode: Clusters, Taxonomy, or Merged (taxonomy wins if score>=2)
         mode = st.radio("Final driver mode", ["Merged (recommended)","Clusters only","Taxonomy only"], index=0)
@@ -89,12 +165,8 @@ if refined is None or freq_all is None or fig_top is None or dirty:
             refined["final_driver"] = refined["taxonomy_match"].fillna("Other")
         else:
             # merged
-            refined["final_driver"] = refined.apply(lambda r: r["taxonomy_match"] if (pd.notna(r["taxonomy_match"]) and r["taxonomy_score"]>=2) else r["driver"], axis=1)
+            refined["final_driver"] = refined["taxonomy_match"].where(refined["taxonomy_score"] >= 2, refined["driver"])
         # --- Taxonomy conflict fix & fill 'Other' ---
-        tx = refined["text"].astype(str).apply(lambda t: match_taxonomy(t, entries))
-        refined["taxonomy_match"] = tx.apply(lambda r: r[0])
-        refined["taxonomy_score"] = tx.apply(lambda r: r[1])
-
         # Force “access point”-style incidents to Network Hardware / Interface
         mask_ap = refined["text"].str.contains(r"\b(?:access point|wlc|wireless controller|wlan|ssid|thin ap|gigabitethernet)\b", case=False, na=False)
         refined.loc[mask_ap, "final_driver"] = "Network Hardware / Interface"
@@ -120,4 +192,28 @@ else:
     st.plotly_chart(fig_top, use_container_width=True)
     st.dataframe(freq_all.head(50), use_container_width=True)
 
+# Parameter sweep: compare min_cluster_size settings on the rules' "Other" rows in one pass
+other_text = st.session_state.get("rules_other_text")
+if other_text is not None and len(other_text):
+    with st.expander("Tune clustering (parameter sweep)", expanded=False):
+        c1, c2, c3 = st.columns(3)
+        sizes = c1.text_input("Min cluster sizes", "10,15,25,40,60")
+        samples = c2.text_input("Min samples (blank = same as size)", "")
+        n_jobs = c3.number_input("Worker processes", 1, 64, 4, 1)
+        if st.button("Run sweep"):
+            with st.spinner("Fitting every setting on shared features…"):
+                table = sweep_clustering(
+                    other_text,
+                    min_cluster_sizes=[int(x) for x in sizes.split(",") if x.strip()],
+                    min_samples=[int(x) for x in samples.split(",") if x.strip()] or [None],
+                    target_other_pct=target_other,
+                    use_hashing=use_hashing,
+                    max_features=max_features,
+                    n_jobs=int(n_jobs),
+                    use_projection=use_projection,
+                    feature_cache_mb=feature_cache_mb)
+            st.caption("Coverage is the share of 'Other' tickets clustered in a single round; "
+                       "silhouette and DBCV are computed on a sample of clustered texts (higher is better).")
+            st.dataframe(table, use_container_width=True)
+
 st.info("Next → open **📈 Trends & Insights** then **💰 Cost & ROI**.")
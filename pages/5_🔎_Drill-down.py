@@ -6,6 +6,7 @@ import pathlib, io, zipfile
 from analytics.xlsx_export import build_processed_workbook
 from analytics.report import driver_kpis, roi_table as roi_from_kpis
 from analytics.views_store import save_view, list_views, load_view
+from storage.db import load_columns
 
 # Theme
 st.markdown("<style>" + pathlib.Path("assets/theme.css").read_text() + "</style>", unsafe_allow_html=True)
@@ -27,6 +28,16 @@ else:
 
 df["Final Driver"] = df.get("final_driver", df.get("driver", "Other")).astype(str)
 
+# Granularity: regroup clustered drivers by cutting the merge tree built on the Drivers page
+hierarchy = st.session_state.get("driver_hierarchy")
+if hierarchy is not None and len(hierarchy.leaves) > 1:
+    n_leaves = len(hierarchy.leaves)
+    n_groups = st.slider("Driver granularity (clustered drivers: coarse → fine)", 1, n_leaves, n_leaves, key="dd_granularity")
+    coarse = hierarchy.cut(n_groups)
+    df["Sub-driver"] = df["Final Driver"]
+    df["Final Driver"] = df["Final Driver"].map(lambda d: coarse.get(d, d))
+df["Final Driver"] = df["Final Driver"].astype("category")
+
 ag_col = "assignment_group" if "assignment_group" in df.columns else None
 persona_col = "u_persona" if "u_persona" in df.columns else None
 site_col    = "u_site" if "u_site" in df.columns else None
@@ -72,6 +83,8 @@ months  = sorted(df["_month"].dropna().unique().tolist(), key=lambda s: (s=="Unk
 ag_opts = sorted(df[ag_col].dropna().unique().tolist()) if ag_col else []
 per_opts= sorted(df[persona_col].dropna().unique().tolist()) if persona_col else []
 site_opts=sorted(df[site_col].dropna().unique().tolist()) if site_col else []
+if "dd_drivers" in st.session_state:   # a granularity change renames drivers; drop stale selections
+    st.session_state["dd_drivers"] = [d for d in st.session_state["dd_drivers"] if d in drivers]
 
 fcols = st.columns(5)
 sel_driver  = fcols[0].multiselect("Driver", drivers, default=st.session_state.get("dd_drivers", drivers[: min(8, len(drivers))]), key="dd_drivers")
@@ -99,19 +112,26 @@ c3.metric("Reopen Rate %", f"{reo:.1f}%")
 
 # Charts / tables
 if ag_col:
-    g = fdf.groupby([ag_col, "Final Driver"]).size().reset_index(name="Tickets").sort_values("Tickets", ascending=False)
+    g = fdf.groupby([ag_col, "Final Driver"], observed=True).size().reset_index(name="Tickets").sort_values("Tickets", ascending=False)
     st.subheader("Tickets by Assignment Group × Driver")
     fig = px.bar(g, x=ag_col, y="Tickets", color="Final Driver", title="Volume by Assignment Group", barmode="stack")
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(g, use_container_width=True)
 else:
     st.info("No `assignment_group` column detected. Showing Driver × Month.")
-    g = fdf.groupby(["Final Driver","_month"]).size().reset_index(name="Tickets")
+    g = fdf.groupby(["Final Driver","_month"], observed=True).size().reset_index(name="Tickets")
     fig = px.bar(g, x="_month", y="Tickets", color="Final Driver", title="Volume by Month", barmode="stack")
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(g, use_container_width=True)
 
 st.subheader("Filtered Incidents (detail)")
+raw_key, dropped = st.session_state.get("raw_key"), st.session_state.get("dropped_columns") or []
+if raw_key and dropped:
+    extra = st.multiselect("Add source columns (loaded from the upload cache)", dropped, key="dd_extra_cols")
+    if extra:
+        cols = load_columns(raw_key, extra)
+        if cols is not None:
+            fdf = fdf.join(cols.reindex(fdf.index))
 st.dataframe(fdf, use_container_width=True)
 
 # Exports (filtered slice)
@@ -0,0 +1,254 @@
+import hashlib, json, os, shutil, sqlite3, time
+from typing import Dict, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+BASE_DIR = "storage/cache"
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+FEATURE_DIR = os.path.join(BASE_DIR, "features")
+LABEL_DB = os.path.join(BASE_DIR, "labels.sqlite")
+LATEST = "latest.json"
+
+def content_hash(data) -> str:
+    """Hash raw bytes or a binary file-like object (read in 8 MB blocks)."""
+    h = hashlib.blake2b(digest_size=20)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        h.update(data)
+    else:
+        pos = data.tell() if hasattr(data, "tell") else None
+        for block in iter(lambda: data.read(8 << 20), b""):
+            h.update(block)
+        if pos is not None: data.seek(pos)
+    return h.hexdigest()
+
+def artifact_key(file_hash: str, mapping: Optional[Dict] = None, kind: str = "norm") -> str:
+    """Cache key for a workbook (by content hash) plus the column mapping applied to it."""
+    m = json.dumps(mapping or {}, sort_keys=True, default=str)
+    return f"{kind}-" + hashlib.blake2b((file_hash + "|" + m).encode(), digest_size=20).hexdigest()
+
+def _paths(key: str, base_dir: str) -> Tuple[str, str]:
+    return os.path.join(base_dir, f"{key}.parquet"), os.path.join(base_dir, f"{key}.json")
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """Object columns holding mixed Python types (e.g. raw Excel columns) can't go to Arrow as-is."""
+    out = df
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_object_dtype(s) and pd.api.types.infer_dtype(s, skipna=True) not in ("string", "empty", "boolean"):
+            if out is df: out = df.copy()
+            out[c] = s.astype("string")
+    if any(not isinstance(c, str) for c in out.columns):
+        out = out.rename(columns=str)
+    return out
+
+# text comes back Arrow-backed, as compaction left it (plain to_pandas() rebuilds Python strings)
+_STRING = pd.StringDtype("pyarrow")
+_TYPES = {pa.string(): _STRING, pa.large_string(): _STRING}.get
+
+def save_frame(key: str, df: pd.DataFrame, meta: Optional[Dict] = None,
+               base_dir: str = BASE_DIR, mark_latest: bool = False, max_mb: float = 0) -> str:
+    """Persist a DataFrame (Parquet) and its notes (JSON sidecar) under ``key``.
+
+    ``mark_latest`` records the key so ``latest_key()`` can restore it after a reload.
+    ``max_mb > 0`` then evicts least recently used frames (see ``evict_frames``).
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    path, meta_path = _paths(key, base_dir)
+    tmp = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(_arrow_safe(df), preserve_index=False), tmp)
+    os.replace(tmp, path)   # atomic, so a concurrent reader never sees a partial file
+    with open(meta_path, "w") as f:
+        json.dump({"key": key, "saved_at": time.time(), "meta": meta or {}}, f, default=str)
+    if mark_latest:
+        set_latest(key, base_dir)
+    if max_mb:
+        evict_frames(max_mb, base_dir, keep=key)
+    return path
+
+def load_frame(key: str, base_dir: str = BASE_DIR) -> Optional[Tuple[pd.DataFrame, Dict]]:
+    """Memory-map a cached frame; returns ``(df, meta)`` or ``None`` on a miss."""
+    path, meta_path = _paths(key, base_dir)
+    if not os.path.exists(path): return None
+    try:
+        df = pq.read_table(path, memory_map=True).to_pandas(types_mapper=_TYPES)
+    except (pa.ArrowException, OSError):
+        return None
+    os.utime(path)   # LRU: the Parquet mtime is the last access
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = (json.load(f) or {}).get("meta", {})
+    return df, meta
+
+def load_columns(key: str, columns, base_dir: str = BASE_DIR) -> Optional[pd.DataFrame]:
+    """Read only ``columns`` of a cached frame (Parquet is columnar, so the rest stay on disk)."""
+    path, _ = _paths(key, base_dir)
+    if not os.path.exists(path): return None
+    avail = set(pq.ParquetFile(path).schema_arrow.names)
+    cols = [c for c in columns if c in avail]
+    return pq.read_table(path, columns=cols, memory_map=True).to_pandas(types_mapper=_TYPES)
+
+def evict_frames(max_mb: float, base_dir: str = BASE_DIR, keep: Optional[str] = None) -> None:
+    """Delete least recently used cached frames until their total size is at most ``max_mb``.
+
+    The latest frame (``latest_key``) and the raw upload it was normalized from
+    are never evicted, so "Restore last loaded dataset" keeps working.
+    """
+    if not os.path.isdir(base_dir): return
+    latest = latest_key(base_dir)
+    protect = {keep, latest}
+    if latest and os.path.exists(_paths(latest, base_dir)[1]):
+        with open(_paths(latest, base_dir)[1]) as f:
+            protect.add(((json.load(f) or {}).get("meta") or {}).get("raw_key"))
+    entries = []
+    for name in os.listdir(base_dir):
+        if not name.endswith(".parquet"): continue
+        key = name[:-len(".parquet")]
+        files = [f for f in _paths(key, base_dir) if os.path.exists(f)]
+        entries.append((os.path.getmtime(files[0]), key, sum(os.path.getsize(f) for f in files)))
+    def remove(key):
+        for f in _paths(key, base_dir):
+            if os.path.exists(f): os.remove(f)
+    _evict_lru(entries, max_mb, protect, remove)
+
+def _evict_lru(entries, max_mb: float, protect, remove) -> None:
+    """Oldest-first removal of ``(mtime, name, size)`` entries until the total fits ``max_mb``."""
+    total = sum(e[2] for e in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_mb * 2**20: break
+        if name in protect: continue
+        remove(name)
+        total -= size
+
+def set_latest(key: str, base_dir: str = BASE_DIR) -> None:
+    os.makedirs(base_dir, exist_ok=True)
+    with open(os.path.join(base_dir, LATEST), "w") as f:
+        json.dump({"key": key}, f)
+
+def latest_key(base_dir: str = BASE_DIR) -> Optional[str]:
+    """Key of the most recently saved frame, used to restore a session after a reload."""
+    p = os.path.join(base_dir, LATEST)
+    if not os.path.exists(p): return None
+    with open(p) as f:
+        key = (json.load(f) or {}).get("key")
+    return key if key and os.path.exists(_paths(key, base_dir)[0]) else None
+
+def save_model(key: str, obj, meta: Optional[Dict] = None, base_dir: str = MODEL_DIR) -> str:
+    """Persist a fitted model bundle (joblib) and its metadata (JSON sidecar) under ``key``."""
+    import joblib
+    os.makedirs(base_dir, exist_ok=True)
+    path, meta_path = os.path.join(base_dir, f"{key}.joblib"), os.path.join(base_dir, f"{key}.json")
+    tmp = path + ".tmp"
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+    with open(meta_path, "w") as f:
+        json.dump({"key": key, "saved_at": time.time(), "meta": meta or {}}, f, default=str)
+    return path
+
+def load_model(key: str, base_dir: str = MODEL_DIR) -> Optional[Tuple[object, Dict]]:
+    """Load a bundle saved by ``save_model``; returns ``(obj, meta)`` or ``None`` on a miss."""
+    import joblib
+    path, meta_path = os.path.join(base_dir, f"{key}.joblib"), os.path.join(base_dir, f"{key}.json")
+    if not os.path.exists(path): return None
+    try:
+        obj = joblib.load(path)
+    except Exception:   # stale pickle from another library version
+        return None
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = (json.load(f) or {}).get("meta", {})
+    return obj, meta
+
+def feature_key(text_fingerprint: str, **settings) -> str:
+    """Cache key for a feature matrix: the text content plus every setting that changes it."""
+    m = json.dumps(settings, sort_keys=True, default=str)
+    return "feat-" + hashlib.blake2b((text_fingerprint + "|" + m).encode(), digest_size=20).hexdigest()
+
+def save_features(key: str, X, Xs, vec, svd, max_mb: float, base_dir: str = FEATURE_DIR) -> str:
+    """Store ``X`` (.npz), ``Xs`` (.npy, memory-mappable) and the fitted ``vec``/``svd`` (joblib)
+    under ``key``, then evict least recently used entries until the cache fits ``max_mb``."""
+    import joblib, numpy as np
+    from scipy import sparse
+    path = os.path.join(base_dir, key)
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    sparse.save_npz(os.path.join(tmp, "X.npz"), sparse.csr_matrix(X), compressed=False)
+    np.save(os.path.join(tmp, "Xs.npy"), np.asarray(Xs))
+    joblib.dump({"vec": vec, "svd": svd}, os.path.join(tmp, "models.joblib"))
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    evict_features(max_mb, base_dir, keep=key)
+    return path
+
+def load_features(key: str, base_dir: str = FEATURE_DIR):
+    """``(X, Xs, vec, svd)`` for ``key`` with ``Xs`` memory-mapped read-only, or ``None`` on a miss."""
+    import joblib, numpy as np
+    from scipy import sparse
+    path = os.path.join(base_dir, key)
+    if not os.path.isdir(path): return None
+    try:
+        X = sparse.load_npz(os.path.join(path, "X.npz"))
+        Xs = np.load(os.path.join(path, "Xs.npy"), mmap_mode="r")
+        models = joblib.load(os.path.join(path, "models.joblib"))
+    except Exception:   # partial or stale entry
+        return None
+    os.utime(path)   # LRU: the directory mtime is the last access
+    return X, Xs, models["vec"], models["svd"]
+
+def evict_features(max_mb: float, base_dir: str = FEATURE_DIR, keep: Optional[str] = None) -> None:
+    """Delete least recently used feature entries until their total size is at most ``max_mb``."""
+    if not os.path.isdir(base_dir): return
+    entries = []
+    for name in os.listdir(base_dir):
+        d = os.path.join(base_dir, name)
+        if not os.path.isdir(d) or name.endswith(".tmp"): continue
+        size = sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d))
+        entries.append((os.path.getmtime(d), name, size))
+    _evict_lru(entries, max_mb, {keep}, lambda name: shutil.rmtree(os.path.join(base_dir, name), ignore_errors=True))
+
+def _label_db(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path)
+    con.execute("""CREATE TABLE IF NOT EXISTS cluster_labels (
+                       provider TEXT, model TEXT, signature BLOB,
+                       title TEXT, rationale TEXT, source TEXT, created_at REAL)""")
+    con.execute("CREATE INDEX IF NOT EXISTS cluster_labels_pm ON cluster_labels (provider, model, created_at)")
+    return con
+
+def get_cached_labels(signatures, provider: str, model: str, threshold: float, ttl_days: float,
+                      path: str = LABEL_DB):
+    """Best stored label per signature (MinHash, ``uint32`` arrays of equal length).
+
+    Similarity is the share of equal MinHash slots (an estimate of Jaccard
+    similarity); entries older than ``ttl_days`` are ignored. Returns a list with
+    ``(title, rationale, source, similarity)`` or ``None`` per signature.
+    """
+    import numpy as np
+    if not signatures: return []
+    with _label_db(path) as con:
+        rows = con.execute("SELECT signature, title, rationale, source FROM cluster_labels "
+                           "WHERE provider = ? AND model = ? AND created_at >= ?",
+                           (provider, model, time.time() - ttl_days * 86400)).fetchall()
+    rows = [r for r in rows if len(r[0]) == signatures[0].nbytes]
+    if not rows: return [None] * len(signatures)
+    stored = np.vstack([np.frombuffer(r[0], dtype=np.uint32) for r in rows])
+    out = []
+    for sig in signatures:
+        sim = (stored == sig).mean(axis=1)
+        best = int(sim.argmax())
+        out.append((rows[best][1], rows[best][2], rows[best][3], float(sim[best])) if sim[best] >= threshold else None)
+    return out
+
+def put_cached_labels(entries, provider: str, model: str, ttl_days: Optional[float] = None,
+                      path: str = LABEL_DB) -> None:
+    """Store ``(signature, title, rationale, source)`` tuples and, given ``ttl_days``,
+    delete every entry older than that (``get_cached_labels`` would ignore it anyway)."""
+    now = time.time()
+    with _label_db(path) as con:
+        if ttl_days is not None:
+            con.execute("DELETE FROM cluster_labels WHERE created_at < ?", (now - ttl_days * 86400,))
+        con.executemany("INSERT INTO cluster_labels VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(provider, model, sig.tobytes(), t, r, src, now) for sig, t, r, src in entries])
@@ -0,0 +1,4 @@
+import os, sys
+
+# tests import the app packages (analytics, connectors, storage) from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+import random
+import pandas as pd
+from analytics.cluster import iterative_other_reduction
+
+def _topics(seed=0):
+    """4 large and 26 small topics: round 0 (large min cluster size) leaves the small ones in Other."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(400)]
+    rows = []
+    for g in range(30):
+        core = rng.sample(vocab, 4)
+        rows += [" ".join(core + rng.sample(vocab, 1)) for _ in range(400 if g < 4 else 40)]
+    return pd.DataFrame({"text": rows, "driver": "Other"})
+
+def test_sampled_rounds_recover_rows_outside_the_sample():
+    df = _topics()
+    report = {}
+    out = iterative_other_reduction(df, min_cluster_size=100, shrink=0.35, target_other_pct=0.0,
+                                    sample_size=1500, report=report)
+    rounds = report["rounds"]
+    assert report["sampling"][0]["sample"] < report["dedup"]["unique"]
+    assert len(rounds) > 1 and rounds[0]["other_pct"] > 20
+    assert all(r["mode"] != "recut" for r in rounds)
+    assert (out["driver"] == "Other").mean() < 0.05
+
+def test_compare_full_reports_agreement_per_sampled_round():
+    df = _topics()
+    report = {}
+    iterative_other_reduction(df, target_other_pct=0.0, max_rounds=1, min_cluster_size=100,
+                              sample_size=1500, compare_full=True, report=report)
+    ari = report["sampling"][0]["ari_vs_full"]
+    assert 0.5 < ari <= 1.0
+
+def test_unsampled_rounds_shrink_other():
+    df = _topics()
+    report = {}
+    out = iterative_other_reduction(df, min_cluster_size=100, shrink=0.35, target_other_pct=0.0, report=report)
+    rounds = report["rounds"]
+    assert rounds[0]["other_pct"] > 20
+    assert all(r["recovered"] > 0 for r in rounds[1:])
+    assert (out["driver"] == "Other").mean() < 0.05
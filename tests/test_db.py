@@ -0,0 +1,43 @@
+import os, sqlite3, time
+import numpy as np
+import pandas as pd
+from storage.db import (artifact_key, evict_frames, get_cached_labels, latest_key, load_frame,
+                        put_cached_labels, save_frame)
+
+def test_upload_cache_evicts_least_recently_used_but_keeps_latest(tmp_path):
+    base = str(tmp_path)
+    df = pd.DataFrame({"text": [f"ticket {i} " * 20 for i in range(2000)]})
+    raw0 = artifact_key("h0", kind="raw")
+    save_frame(raw0, df, base_dir=base)
+    save_frame("norm-0", df, {"raw_key": raw0}, base_dir=base, mark_latest=True)
+    for i in range(1, 4):
+        save_frame(f"raw-{i}", df, base_dir=base)
+        os.utime(os.path.join(base, f"raw-{i}.parquet"), (time.time() - 100 * (4 - i),) * 2)
+    assert load_frame("raw-1", base_dir=base) is not None     # touched: now the most recent
+    size_mb = os.path.getsize(os.path.join(base, "raw-1.parquet")) / 2**20
+    evict_frames(3.2 * size_mb, base_dir=base)
+    left = sorted(f[:-8] for f in os.listdir(base) if f.endswith(".parquet"))
+    assert left == sorted([raw0, "norm-0", "raw-1"])
+    assert latest_key(base) == "norm-0"
+
+def test_compacted_dtypes_survive_the_upload_cache(tmp_path):
+    from analytics.validator import validate_and_normalize
+    raw = pd.DataFrame({"short_description": [f"printer jam {i % 50}" for i in range(3000)],
+                        "description": [f"tray {i}" for i in range(3000)],
+                        "assignment_group": [f"g{i % 5}" for i in range(3000)]})
+    df, _ = validate_and_normalize(raw)
+    save_frame("norm-x", df, base_dir=str(tmp_path))
+    back, _ = load_frame("norm-x", base_dir=str(tmp_path))
+    assert back.dtypes.to_dict() == df.dtypes.to_dict()
+    assert back.memory_usage(deep=True).sum() <= df.memory_usage(deep=True).sum()
+
+def test_label_cache_drops_expired_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "labels.sqlite")
+    sig = np.arange(64, dtype=np.uint32)
+    monkeypatch.setattr(time, "time", lambda: 1_000_000.0)
+    put_cached_labels([(sig, "Old", "", "openai"), (sig + 1, "Old too", "", "openai")], "openai", "m", ttl_days=30, path=path)
+    monkeypatch.setattr(time, "time", lambda: 1_000_000.0 + 31 * 86400)
+    put_cached_labels([(sig + 2, "New", "", "openai")], "openai", "m", ttl_days=30, path=path)
+    with sqlite3.connect(path) as con:
+        assert [t for (t,) in con.execute("SELECT title FROM cluster_labels")] == ["New"]
+    assert get_cached_labels([sig + 2], "openai", "m", 0.9, 30, path=path)[0][0] == "New"
@@ -0,0 +1,37 @@
+import io, time
+import numpy as np
+from openpyxl import Workbook
+from analytics.ingest import read_workbook
+from analytics.perf import PeakRSS, _status_mb
+
+def test_peak_rss_is_per_step():
+    with PeakRSS() as big:
+        a = np.ones(40_000_000)            # ~300 MB, freed before the next step
+        time.sleep(0.1); del a             # held long enough to be sampled even below the process peak
+    with PeakRSS() as small:
+        b = np.ones(1_000_000); del b
+    assert big.delta_mb > 200
+    assert small.delta_mb < 50 and small.peak_mb < big.peak_mb - 200
+
+def test_peak_rss_leaves_the_process_high_water_mark_alone():
+    with PeakRSS() as outer:
+        a = np.ones(30_000_000)            # ~230 MB peak inside the outer block only
+        time.sleep(0.1); del a
+        hwm = _status_mb("VmHWM")
+        with PeakRSS():
+            pass
+        assert _status_mb("VmHWM") >= hwm
+    assert outer.delta_mb > 150
+
+def test_read_workbook_compacts_chunks_and_reports_memory():
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Number", "Short description", "Description", "Assignment group", "Reassignment count"])
+    for i in range(2500):
+        ws.append([f"INC{i:05d}", f"printer jam {i % 7}", "tray 2 keeps jamming", f"grp{i % 3}", i % 4])
+    buf = io.BytesIO(); wb.save(buf); buf.seek(0)
+    raw, used, stats = read_workbook(buf, chunk_rows=1000)
+    assert len(raw) == 2500 and used == [ws.title]
+    assert raw["Assignment group"].dtype == "category"
+    assert str(raw["Reassignment count"].dtype) == "int8"
+    assert {"peak_rss_mb", "rss_delta_mb"} <= set(stats[0])
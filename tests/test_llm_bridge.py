@@ -0,0 +1,80 @@
+import asyncio, json, random
+from analytics.llm_bridge import LabelConfig, cluster_signatures, label_clusters
+
+CLUSTERS = {f"c{i}": [f"printer jam tray {i}", "printer paper jam"] * 3 for i in range(20)}
+
+def _provider(seconds, title):
+    async def complete(system, prompt, max_tokens):
+        await asyncio.sleep(seconds)
+        return json.dumps({"title": title, "rationale": ""})
+    return complete
+
+def _batch_provider(seconds, title):
+    async def complete(system, prompt, max_tokens):
+        await asyncio.sleep(seconds)
+        n = prompt.count("### Cluster ")
+        return json.dumps({"labels": [{"id": i, "title": title, "rationale": ""} for i in range(1, n + 1)]})
+    return complete
+
+def test_deadline_timeouts_do_not_open_the_breaker():
+    report = {}
+    cfg = LabelConfig(concurrency=4, rate_per_sec=1000, burst=50, timeout=30, deadline=0.5, breaker_failures=1)
+    out = label_clusters(CLUSTERS, cfg, providers=[("hang", _provider(100, "Never"))], report=report)
+    assert report["deadline_hit"]
+    assert report["breaker_open"] == []
+    assert report["errors_by_source"] == {"hang": 0}
+    assert {src for _, _, src in out.values()} == {"python"}
+
+def test_hedge_loser_teaches_latency():
+    # the primary loses the hedge race; its cancelled attempt must still reach the EWMA
+    report = {}
+    cfg = LabelConfig(concurrency=2, rate_per_sec=1000, burst=50, timeout=0.4, hedge_factor=2.0,
+                      batch_size=len(CLUSTERS), batch_tokens=10**6)
+    out = label_clusters(CLUSTERS, cfg, providers=[("slow", _batch_provider(0.3, "Slow")), ("fast", _batch_provider(0.02, "Fast"))],
+                         report=report)
+    assert report["hedged"] == 1
+    assert {src for _, _, src in out.values()} == {"fast"}
+    assert report["latency"]["slow"] > report["latency"]["fast"]
+
+def test_hedges_stay_within_the_concurrency_bound():
+    inflight, peak = [0], [0]
+    def counted(seconds, title):
+        inner = _provider(seconds, title)
+        async def complete(system, prompt, max_tokens):
+            inflight[0] += 1; peak[0] = max(peak[0], inflight[0])
+            try:
+                return await inner(system, prompt, max_tokens)
+            finally:
+                inflight[0] -= 1
+        return complete
+    report = {}
+    cfg = LabelConfig(concurrency=2, rate_per_sec=1000, burst=50, timeout=0.4, hedge_factor=2.0)
+    label_clusters(CLUSTERS, cfg, providers=[("slow", counted(0.3, "Slow")), ("fast", counted(0.02, "Fast"))],
+                   report=report)
+    assert peak[0] <= 2
+
+BOILERPLATE = ["hi team could you please look into this", "user reports that since this morning",
+               "unable to work urgent", "thanks and regards from the field office",
+               "called the service desk twice already", "still not working after restart of the laptop",
+               "manager asked to escalate quickly", "attached screenshot below for reference",
+               "tried again from home network", "kindly advise next steps"]
+TOPICS = {
+    "pw": ["password reset", "account locked out", "forgot password", "reset my password", "locked account ad"],
+    "pr": ["printer jam", "printer offline", "toner empty", "cannot print", "print queue stuck"],
+    "vpn": ["vpn disconnects", "vpn client error", "anyconnect vpn", "remote access vpn"],
+    "mail": ["outlook crash", "mailbox full", "email not syncing"],
+}
+
+def _tickets(topic, n, seed):
+    r = random.Random(seed)
+    return [f"{r.choice(BOILERPLATE)} {r.choice(BOILERPLATE)} {r.choice(TOPICS[topic])} {r.choice(BOILERPLATE)}"
+            for _ in range(n)]
+
+def test_signatures_separate_unrelated_clusters_and_match_reruns():
+    two = cluster_signatures({"pw": _tickets("pw", 60, 1), "pr": _tickets("pr", 60, 2)})
+    assert (two["pw"] == two["pr"]).mean() < 0.3
+    a = cluster_signatures({k: _tickets(k, 60, i) for i, k in enumerate(["pw", "pr", "vpn"])})
+    b = cluster_signatures({k: _tickets(k, 40, 10 + i) for i, k in enumerate(["pw", "pr", "vpn", "mail"])})
+    for k in a:
+        assert (a[k] == b[k]).mean() >= LabelConfig().cache_threshold
+        assert max((a[k] == b[j]).mean() for j in b if j != k) < 0.3
@@ -0,0 +1,28 @@
+import pandas as pd
+from analytics.taxonomy import (load_taxonomy_entries, compile_taxonomy_entries, match_taxonomy,
+                                build_taxonomy_scorer, score_taxonomy)
+from analytics.textnorm import text_features
+
+TEXTS = [
+    "provisioning request for new hire",
+    "entitlements missing after transfer",
+    "ssids not visible on floor 3",
+    "wlc01 reboot loop",
+    "enablement of sap role",
+    "shared mailboxes not syncing",
+    "self service password portal down",
+    "unlock user account please",
+    "access point offline near lobby",
+    "printer jam",
+    "",
+]
+
+def test_scorer_matches_regex_path_on_inflected_words():
+    entries = load_taxonomy_entries()
+    compiled = compile_taxonomy_entries(entries)
+    got = score_taxonomy(text_features(pd.Series(TEXTS)), build_taxonomy_scorer(entries))
+    for i, text in enumerate(TEXTS):
+        name, score = match_taxonomy(text, compiled)
+        assert got["taxonomy_score"].iloc[i] == score, text
+        if score > 0:
+            assert got["taxonomy_match"].iloc[i] == name, text
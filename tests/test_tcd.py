@@ -0,0 +1,29 @@
+import random
+import pandas as pd
+from analytics.tcd import derive_drivers, load_rules
+from analytics.textnorm import normalize_text
+
+def _old_loop(texts, rules):
+    """The per-rule ``str.contains`` pass the keyword engine replaced (first rule wins)."""
+    norm = texts.map(normalize_text)
+    out = pd.Series("Other", index=texts.index, dtype=object)
+    for rule in rules:
+        out[norm.str.contains(rule["regex"], na=False) & (out == "Other")] = rule["name"]
+    return out
+
+def test_engine_matches_per_rule_loop_with_hundreds_of_rules():
+    import re
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(3000)]
+    rules = list(load_rules())
+    for i in range(600):
+        kws = [" ".join(rng.sample(vocab, rng.randint(1, 3))) for _ in range(3)]
+        if i == 599: kws.append("cannot connect to the vpn client")   # one long keyword
+        rules.append({"name": f"r{i}", "keywords": kws,
+                      "regex": re.compile(r"\b(?:" + "|".join(map(re.escape, kws)) + r")\b", re.I)})
+    kw = [k for r in rules for k in r["keywords"]]
+    texts = pd.Series([" ".join(rng.choice(kw) if rng.random() < 0.3 else rng.choice(vocab) for _ in range(8))
+                       for _ in range(3000)] + ["I cannot connect to the VPN client!", "printer jam"])
+    df = pd.DataFrame({"short_description": texts, "description": ""})
+    got, _ = derive_drivers(df, rules)
+    assert got["driver"].tolist() == _old_loop(texts + " ", rules).tolist()
@@ -0,0 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from analytics import textnorm
+
+def test_text_features_cache_is_bounded_by_bytes_and_thread_safe(monkeypatch):
+    monkeypatch.setattr(textnorm, "CACHE_MB", 1)
+    monkeypatch.setattr(textnorm, "_CACHE", type(textnorm._CACHE)())
+    frames = [pd.Series([f"ticket {k} row {i} printer jam" for i in range(3000)]) for k in range(12)]
+    with ThreadPoolExecutor(6) as ex:
+        got = list(ex.map(lambda s: textnorm.text_features(s), frames * 3))
+    assert all(g.norm.iloc[0] == f"ticket {k % 12} row 0 printer jam" for k, g in enumerate(got))
+    sizes = [n for _, n in textnorm._CACHE.values()]
+    assert sum(sizes) <= 2**20 or len(sizes) == 1
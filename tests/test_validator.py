@@ -0,0 +1,11 @@
+import pandas as pd
+from analytics.validator import _parse_dates
+
+def test_minority_date_format_is_not_dropped_to_nat():
+    iso = [f"2024-03-{d % 28 + 1:02d} 10:00:00" for d in range(90)]
+    us = [f"03/{d % 28 + 1:02d}/2024 09:30" for d in range(10)]
+    df = pd.DataFrame({"opened_dt": iso + us + [None, ""]})
+    for frame in (df, df.astype("category")):
+        out = _parse_dates(frame.copy())["opened_dt"]
+        assert out.notna().sum() == 100
+        assert out.iloc[95] == pd.Timestamp("2024-03-06 09:30")